@@ -3,22 +3,41 @@ Point d'entrée principal de l'API FastAPI (Invoice Downloader — multi-fournis
 """
 
 import asyncio
+import atexit
 import json
 import logging
+import os
+import queue
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, AsyncIterator, Optional
+from urllib.parse import quote
 
 # Timeout max pour un téléchargement (évite que la requête reste bloquée indéfiniment)
 DOWNLOAD_TIMEOUT_SECONDS = 600  # 10 minutes
+# Progression SSE : taille du tampon et fenêtre de regroupement des doublons
+PROGRESS_BUFFER_SIZE = 64
+PROGRESS_COALESCE_SECONDS = 0.05
 
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
+import anyio
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import (
+    FileResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from starlette.types import Receive, Scope, Send
 
 from backend.models.schemas import (
     DownloadRequest,
@@ -29,15 +48,43 @@ from backend.models.schemas import (
     ProvidersResponse,
     StatusResponse,
 )
-from backend.providers import PROVIDER_LABELS, PROVIDERS
-from backend.providers.amazon import AmazonProvider
-from backend.providers.bouygues import BouyguesProvider
-from backend.providers.decathlon import DecathlonProvider
-from backend.providers.fnac import FnacProvider
-from backend.providers.free_mobile import FreeMobileProvider
-from backend.providers.freebox import FreeboxProvider
-from backend.providers.orange import OrangeProvider
-from backend.providers.qobuz import QobuzProvider
+from backend.providers import PROVIDER_LABELS, PROVIDERS, get_provider_cls
+from backend.providers.base import OTPRequiredError
+from backend.providers.browser_pool import BrowserPool
+
+# Fournisseurs affichés mais pas encore implémentés (réponse 501)
+_NOT_IMPLEMENTED = frozenset(PROVIDER_LABELS.keys() - PROVIDERS.keys())
+# (id, libellé, implémenté) figés à l'import pour /api/providers
+_PROVIDER_TEMPLATES: tuple[tuple[str, str, bool], ...] = tuple(
+    (pid, name, pid in PROVIDERS) for pid, name in PROVIDER_LABELS.items()
+)
+
+try:
+    import orjson as _orjson
+except ImportError:  # Repli sur json standard si orjson absent
+    _orjson = None  # type: ignore[assignment]
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Sérialise en JSON (bytes) : orjson si installé, sinon json standard."""
+    if _orjson is not None:
+        return _orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+# Préfixes SSE pré-encodés (évite un .encode() par événement)
+_SSE_PROGRESS = b"event: progress\ndata: "
+_SSE_DONE = b"event: done\ndata: "
+_SSE_ERROR = b"event: error\ndata: "
+_SSE_END = b"\n\n"
+
+# Corps JSON constants, sérialisés une seule fois à l'import
+_ROOT_BYTES = _json_dumps(
+    {"status": "ok", "message": "API Invoice Downloader opérationnelle"}
+)
+_NO_OTP_BYTES = _json_dumps(
+    {"success": True, "message": "Aucun code 2FA requis", "requires_otp": False}
+)
 
 # Racine du projet (où se trouve .env), quel que soit le répertoire de travail au démarrage
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -109,6 +156,9 @@ class Settings(BaseSettings):
     # Free Mobile (optionnel) — espace abonné mobile.free.fr
     free_mobile_login: Optional[str] = None  # Identifiant Free Mobile (email ou numéro)
     free_mobile_password: Optional[str] = None
+    free_mobile_max_age_days: Optional[int] = (
+        None  # Au-delà (jours), une facture déjà enregistrée est revalidée
+    )
     # FNAC (optionnel) — espace client fnac.com
     fnac_login: Optional[str] = None  # Email du compte FNAC
     fnac_password: Optional[str] = None
@@ -128,12 +178,15 @@ class Settings(BaseSettings):
     # Qobuz (optionnel) — espace client qobuz.com
     qobuz_login: Optional[str] = None  # Email du compte Qobuz
     qobuz_password: Optional[str] = None
+    # Reverse proxy nginx : fichiers servis par nginx (sendfile) via X-Accel-Redirect
+    use_x_accel: bool = False
     # Interface
     start_single_window: bool = False  # Ouvrir Chrome sur l'UI au démarrage du backend
 
     model_config = SettingsConfigDict(
         env_file=str(_ENV_FILE),
         env_file_encoding="utf-8",
+        env_nested_delimiter=None,
         extra="ignore",
         case_sensitive=False,
     )
@@ -165,31 +218,140 @@ class Settings(BaseSettings):
             raise ValueError(error_msg)
 
 
-# Créer le dossier logs s'il n'existe pas
+class BufferedRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler à écriture bufferisée.
+
+    Les enregistrements sont accumulés dans un tampon (buffer_size) et écrits sur
+    disque toutes les flush_interval secondes par un thread dédié, ou
+    immédiatement pour les niveaux >= WARNING. La taille du fichier est suivie
+    en mémoire pour éviter le seek/tell (qui viderait le tampon) à chaque ligne.
+    """
+
+    def __init__(
+        self,
+        filename: "str | os.PathLike[str]",
+        mode: str = "a",
+        maxBytes: int = 0,
+        backupCount: int = 0,
+        encoding: Optional[str] = None,
+        delay: bool = True,
+        flush_interval: float = 1.0,
+        buffer_size: int = 64 * 1024,
+    ) -> None:
+        self.buffer_size = buffer_size
+        self._size = 0
+        super().__init__(filename, mode, maxBytes, backupCount, encoding, delay)
+        self._flush_stop = threading.Event()
+        threading.Thread(
+            target=self._flush_periodically,
+            args=(flush_interval,),
+            name="log-flush",
+            daemon=True,
+        ).start()
+
+    def _open(self) -> Any:
+        stream = open(
+            self.baseFilename,
+            self.mode,
+            buffering=self.buffer_size,
+            encoding=self.encoding,
+            errors=self.errors,
+        )
+        self._size = os.path.getsize(self.baseFilename)
+        return stream
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            # Mise en forme et encodage une seule fois par enregistrement
+            msg = self.format(record) + self.terminator
+            # maxBytes compte des octets, pas des caractères
+            size = len(msg.encode(self.encoding or "utf-8", "replace"))
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0 and self._size + size >= self.maxBytes:
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(msg)
+            self._size += size
+            if record.levelno >= logging.WARNING:
+                self.stream.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def _flush_periodically(self, interval: float) -> None:
+        while not self._flush_stop.wait(interval):
+            self.flush()
+
+    def close(self) -> None:
+        self._flush_stop.set()
+        super().close()
+
+
+# Créer le dossier logs s'il n'existe pas (un seul appel système, même sous --reload)
 log_dir = Path("logs")
-log_dir.mkdir(exist_ok=True)
-
-# Configuration du logging avec fichier et console
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        # Handler pour fichier avec rotation
-        RotatingFileHandler(
-            log_dir / "app.log", maxBytes=10 * 1024 * 1024, backupCount=5  # 10 MB
-        ),
-        # Handler pour console
-        logging.StreamHandler(sys.stdout),
-    ],
+try:
+    os.mkdir(log_dir)
+except FileExistsError:
+    pass
+
+# Configuration du logging avec fichier et console.
+# Les appelants (boucle asyncio comprise) ne font qu'un put() dans une file ;
+# l'écriture disque / console est faite par le thread du QueueListener.
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_log_formatter = logging.Formatter(
+    "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+# Handler pour fichier avec rotation (flush 1 s, immédiat si >= WARNING)
+_file_handler = BufferedRotatingFileHandler(
+    log_dir / "app.log",
+    maxBytes=10 * 1024 * 1024,  # 10 MB
+    backupCount=5,
+    delay=True,
+    flush_interval=1.0,
+)
+# Handler pour console
+_console_handler = logging.StreamHandler(sys.stdout)
+for _handler in (_file_handler, _console_handler):
+    _handler.setFormatter(_log_formatter)
+_log_listener = QueueListener(
+    _log_queue, _file_handler, _console_handler, respect_handler_level=True
 )
+_log_listener.start()
+
+
+def _stop_log_listener() -> None:
+    """Vide la file de logs et arrête le thread d'écriture (une seule fois)."""
+    if _log_listener._thread is not None:
+        _log_listener.stop()
+
+
+# Arrêt à la sortie du processus : le listener vit plus longtemps que le lifespan
+atexit.register(_stop_log_listener)
+# Le QueueHandler ne transmet que le message ; la mise en forme complète
+# (date, logger, niveau) est faite une seule fois par les handlers du listener.
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
 logger = logging.getLogger(__name__)
 # Debug activé pour les providers en cours de mise au point
 logging.getLogger("backend.providers.fnac").setLevel(logging.DEBUG)
 
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Charge (une seule fois) et valide la configuration depuis .env."""
+    s = Settings()
+    s.validate_settings()
+    return s
+
+
 # Chargement des paramètres
 try:
-    settings = Settings()
-    settings.validate_settings()
+    settings = get_settings()
     logger.info(
         "Configuration chargée et validée (env_file=%s, email=%s)",
         _ENV_FILE,
@@ -206,6 +368,10 @@ except Exception as e:
 
 # Dictionnaire des downloaders par provider (V2 multi-fournisseurs)
 downloaders: dict[str, Any] = {}
+# Pool de navigateurs partagé (Freebox, Free Mobile) ; None si profils Chrome dédiés
+_browser_pool: Optional[BrowserPool] = None
+# Réponse /api/providers mise en cache (ne change qu'au démarrage / arrêt)
+_providers_cache: Optional[ProvidersResponse] = None
 
 
 @asynccontextmanager
@@ -214,8 +380,17 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     Gestionnaire du cycle de vie de l'application.
     Initialise les providers configurés avec répertoire par fournisseur.
     """
-    global downloaders
+    global downloaders, _providers_cache, _browser_pool
+    # Exécuteur borné partagé par tous les asyncio.to_thread (Selenium, 2FA, I/O)
+    executor = ThreadPoolExecutor(
+        max_workers=max(4, os.cpu_count() or 4), thread_name_prefix="invoice-io"
+    )
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(executor)
+    # Boucle choisie par uvicorn (--loop) : uvloop.Loop ou asyncio standard
+    logger.info("Boucle d'événements: %s", type(loop).__module__)
     downloaders = {}
+    _providers_cache = None
     base_path = Path(settings.download_path)
 
     def _chrome_dir(provider_id: str) -> Optional[str]:
@@ -243,14 +418,23 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     if browser == "firefox" and settings.selenium_chrome_profile_dir:
         logger.debug("SELENIUM_CHROME_PROFILE_DIR ignoré (SELENIUM_BROWSER=firefox)")
 
+    # Profil Chrome dédié par provider : navigateur lié au provider, pas de pool
+    if browser == "chrome" and settings.selenium_chrome_profile_dir:
+        _browser_pool = None
+    else:
+        _browser_pool = BrowserPool(
+            keep_browser_open=settings.selenium_keep_browser_open
+        )
+
+    # Chaque provider crée son répertoire (DOWNLOAD_PATH/<id>) dans son constructeur
+
     # Provider Amazon : répertoire ./factures/amazon (ou DOWNLOAD_PATH/amazon)
-    if AmazonProvider.PROVIDER_ID in PROVIDERS:
+    if "amazon" in PROVIDERS:
         if settings.amazon_email and settings.amazon_password:
             try:
                 logger.info("Initialisation du provider Amazon...")
                 amazon_path = base_path / "amazon"
-                amazon_path.mkdir(parents=True, exist_ok=True)
-                downloaders[AmazonProvider.PROVIDER_ID] = AmazonProvider(
+                downloaders["amazon"] = get_provider_cls("amazon")(
                     email=settings.amazon_email,
                     password=settings.amazon_password,
                     download_path=amazon_path,
@@ -276,13 +460,12 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
             )
 
     # Freebox (si identifiants présents)
-    if FreeboxProvider.PROVIDER_ID in PROVIDERS:
+    if "freebox" in PROVIDERS:
         if settings.freebox_login and settings.freebox_password:
             try:
                 logger.info("Initialisation du provider Freebox...")
                 freebox_path = base_path / "freebox"
-                freebox_path.mkdir(parents=True, exist_ok=True)
-                downloaders[FreeboxProvider.PROVIDER_ID] = FreeboxProvider(
+                downloaders["freebox"] = get_provider_cls("freebox")(
                     login=settings.freebox_login,
                     password=settings.freebox_password,
                     download_path=freebox_path,
@@ -292,6 +475,7 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
                     firefox_profile_path=settings.firefox_profile_path,
                     chrome_user_data_dir=_chrome_dir("freebox"),
                     keep_browser_open=settings.selenium_keep_browser_open,
+                    pool=_browser_pool,
                 )
                 logger.info("Provider Freebox initialisé avec succès")
             except Exception as e:
@@ -302,13 +486,12 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
             )
 
     # Free Mobile (si identifiants présents)
-    if FreeMobileProvider.PROVIDER_ID in PROVIDERS:
+    if "free_mobile" in PROVIDERS:
         if settings.free_mobile_login and settings.free_mobile_password:
             try:
                 logger.info("Initialisation du provider Free Mobile...")
                 free_mobile_path = base_path / "free_mobile"
-                free_mobile_path.mkdir(parents=True, exist_ok=True)
-                downloaders[FreeMobileProvider.PROVIDER_ID] = FreeMobileProvider(
+                downloaders["free_mobile"] = get_provider_cls("free_mobile")(
                     login=settings.free_mobile_login,
                     password=settings.free_mobile_password,
                     download_path=free_mobile_path,
@@ -318,6 +501,8 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
                     firefox_profile_path=settings.firefox_profile_path,
                     chrome_user_data_dir=_chrome_dir("free_mobile"),
                     keep_browser_open=settings.selenium_keep_browser_open,
+                    pool=_browser_pool,
+                    max_age_days=settings.free_mobile_max_age_days,
                 )
                 logger.info("Provider Free Mobile initialisé avec succès")
             except Exception as e:
@@ -328,13 +513,12 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
             )
 
     # FNAC (si identifiants présents)
-    if FnacProvider.PROVIDER_ID in PROVIDERS:
+    if "fnac" in PROVIDERS:
         if settings.fnac_login and settings.fnac_password:
             try:
                 logger.info("Initialisation du provider FNAC...")
                 fnac_path = base_path / "fnac"
-                fnac_path.mkdir(parents=True, exist_ok=True)
-                downloaders[FnacProvider.PROVIDER_ID] = FnacProvider(
+                downloaders["fnac"] = get_provider_cls("fnac")(
                     login=settings.fnac_login,
                     password=settings.fnac_password,
                     download_path=fnac_path,
@@ -352,13 +536,12 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
             logger.debug("FNAC non configuré (FNAC_LOGIN / FNAC_PASSWORD absents)")
 
     # Orange (si URL configurée)
-    if OrangeProvider.PROVIDER_ID in PROVIDERS:
+    if "orange" in PROVIDERS:
         if settings.orange_invoices_url:
             try:
                 logger.info("Initialisation du provider Orange...")
                 orange_path = base_path / "orange"
-                orange_path.mkdir(parents=True, exist_ok=True)
-                downloaders[OrangeProvider.PROVIDER_ID] = OrangeProvider(
+                downloaders["orange"] = get_provider_cls("orange")(
                     login=settings.orange_login or "",
                     invoices_url=settings.orange_invoices_url,
                     download_path=orange_path,
@@ -376,13 +559,12 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
             logger.debug("Orange non configuré (ORANGE_INVOICES_URL absent)")
 
     # Bouygues Telecom (si identifiants présents)
-    if BouyguesProvider.PROVIDER_ID in PROVIDERS:
+    if "bouygues" in PROVIDERS:
         if settings.bouygues_login and settings.bouygues_password:
             try:
                 logger.info("Initialisation du provider Bouygues Telecom...")
                 bouygues_path = base_path / "bouygues"
-                bouygues_path.mkdir(parents=True, exist_ok=True)
-                downloaders[BouyguesProvider.PROVIDER_ID] = BouyguesProvider(
+                downloaders["bouygues"] = get_provider_cls("bouygues")(
                     login=settings.bouygues_login,
                     password=settings.bouygues_password,
                     download_path=bouygues_path,
@@ -402,13 +584,12 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
             )
 
     # Decathlon (si identifiants présents)
-    if DecathlonProvider.PROVIDER_ID in PROVIDERS:
+    if "decathlon" in PROVIDERS:
         if settings.decathlon_login and settings.decathlon_password:
             try:
                 logger.info("Initialisation du provider Decathlon...")
                 decathlon_path = base_path / "decathlon"
-                decathlon_path.mkdir(parents=True, exist_ok=True)
-                downloaders[DecathlonProvider.PROVIDER_ID] = DecathlonProvider(
+                downloaders["decathlon"] = get_provider_cls("decathlon")(
                     login=settings.decathlon_login,
                     password=settings.decathlon_password,
                     download_path=decathlon_path,
@@ -428,13 +609,12 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
             )
 
     # Qobuz (si identifiants présents)
-    if QobuzProvider.PROVIDER_ID in PROVIDERS:
+    if "qobuz" in PROVIDERS:
         if settings.qobuz_login and settings.qobuz_password:
             try:
                 logger.info("Initialisation du provider Qobuz...")
                 qobuz_path = base_path / "qobuz"
-                qobuz_path.mkdir(parents=True, exist_ok=True)
-                downloaders[QobuzProvider.PROVIDER_ID] = QobuzProvider(
+                downloaders["qobuz"] = get_provider_cls("qobuz")(
                     login=settings.qobuz_login,
                     password=settings.qobuz_password,
                     download_path=qobuz_path,
@@ -456,8 +636,12 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
         logger.info("START_SINGLE_WINDOW: attente frontend sur %s", _FRONTEND_URL)
         _open_chrome_when_ready(_FRONTEND_URL)
 
+    _providers_cache = _build_providers_response()
+
     yield
 
+    _providers_cache = None
+
     # Shutdown : fermer tous les providers
     for pid, prov in list(downloaders.items()):
         try:
@@ -466,6 +650,12 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
         except Exception as e:
             logger.warning("Fermeture provider %s: %s", pid, e)
 
+    if _browser_pool is not None:
+        await _browser_pool.close()
+        _browser_pool = None
+
+    executor.shutdown(wait=False, cancel_futures=True)
+
 
 # Initialisation de l'application (V2 : multi-fournisseurs)
 app = FastAPI(
@@ -485,24 +675,56 @@ app.add_middleware(
 )
 
 
+class SSEAwareGZipMiddleware(GZipMiddleware):
+    """
+    GZip des réponses JSON volumineuses (liste de fichiers, debug), sauf flux SSE
+    et factures PDF.
+
+    Le compresseur tamponne jusqu'à remplir un bloc : appliqué au flux de
+    progression, il retarderait les événements jusqu'à la fin du téléchargement.
+    Les PDF sont déjà compressés : les passer en gzip coûte du CPU sans rien gagner.
+    """
+
+    excluded_paths = frozenset({"/api/download"})
+    excluded_prefixes = ("/api/invoices/",)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and (
+            scope["path"] in self.excluded_paths
+            or scope["path"].startswith(self.excluded_prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+app.add_middleware(SSEAwareGZipMiddleware, minimum_size=1024, compresslevel=5)
+
+
+async def _is_2fa(downloader: Any) -> bool:
+    """is_2fa_required() (requêtes DOM Selenium) exécuté hors de la boucle asyncio."""
+    return bool(await asyncio.to_thread(downloader.is_2fa_required))
+
+
 def _get_downloader(provider_id: str | None) -> Any:
     """Retourne le downloader du provider ou None si non disponible."""
-    pid = (provider_id or "amazon").strip().lower()
-    return downloaders.get(pid)
+    # Chemin rapide : identifiant déjà canonique (clés en minuscules, sans espaces)
+    downloader = downloaders.get(provider_id or "amazon")
+    if downloader is not None:
+        return downloader
+    return downloaders.get((provider_id or "amazon").strip().lower())
 
 
 @app.get("/", response_model=StatusResponse)
-async def root() -> StatusResponse:
+async def root() -> Response:
     """Endpoint de statut de l'API."""
-    return StatusResponse(status="ok", message="API Invoice Downloader opérationnelle")
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 
-@app.get("/api/providers", response_model=ProvidersResponse)
-async def list_providers() -> ProvidersResponse:
-    """Liste les fournisseurs disponibles et leur statut (configuré, implémenté)."""
+def _build_providers_response() -> ProvidersResponse:
+    """Construit la liste des fournisseurs et leur statut (configuré, implémenté)."""
     providers_list = []
-    for pid, name in PROVIDER_LABELS.items():
-        implemented = pid in PROVIDERS
+    for pid, name, implemented in _PROVIDER_TEMPLATES:
         configured = False
         if pid == "amazon":
             configured = (
@@ -535,12 +757,24 @@ async def list_providers() -> ProvidersResponse:
             configured = bool(settings.qobuz_login) and bool(settings.qobuz_password)
         if implemented:
             configured = configured or pid in downloaders
+        # Valeurs déjà typées : pas de validation pydantic nécessaire
         providers_list.append(
-            ProviderInfo(
+            ProviderInfo.model_construct(
                 id=pid, name=name, configured=configured, implemented=implemented
             )
         )
-    return ProvidersResponse(providers=providers_list)
+    return ProvidersResponse.model_construct(providers=providers_list)
+
+
+@app.get("/api/providers", response_model=ProvidersResponse)
+async def list_providers() -> ProvidersResponse:
+    """Liste les fournisseurs disponibles et leur statut (configuré, implémenté)."""
+    global _providers_cache
+    # Calculée une fois au démarrage (lifespan) ;
+    # construite à la volée si lifespan non exécuté
+    if _providers_cache is None:
+        _providers_cache = _build_providers_response()
+    return _providers_cache
 
 
 @app.get("/api/last-download-date")
@@ -573,6 +807,50 @@ async def last_download_date(provider: str = "amazon") -> dict:
     return {"date": latest.isoformat() if latest else None, "provider": pid}
 
 
+def _tail_log(path: Path, max_bytes: int = 1_048_576) -> bytes:
+    """Lit uniquement les max_bytes derniers octets du fichier (mémoire bornée)."""
+    size = path.stat().st_size
+    with path.open("rb") as f:
+        f.seek(max(0, size - max_bytes))
+        return f.read()
+
+
+@app.get("/api/log", response_class=PlainTextResponse)
+async def read_log() -> PlainTextResponse:
+    """Retourne la fin du fichier logs/app.log (1 Mo max)."""
+    log_path = log_dir / "app.log"
+    if not log_path.exists():
+        return PlainTextResponse("")
+    return PlainTextResponse(_tail_log(log_path).decode("utf-8", "replace"))
+
+
+def _x_accel(path: Path) -> Response:
+    """Délègue l'envoi du fichier à nginx (location interne /internal/)."""
+    relative = path.relative_to(Path(settings.download_path).resolve())
+    response = Response()
+    response.headers["X-Accel-Redirect"] = f"/internal/{quote(relative.as_posix())}"
+    response.headers["Content-Disposition"] = (
+        f"attachment; filename*=utf-8''{quote(path.name)}"
+    )
+    return response
+
+
+@app.get("/api/invoices/{provider_id}/{filename}")
+async def get_invoice_file(provider_id: str, filename: str) -> Response:
+    """Retourne une facture téléchargée (DOWNLOAD_PATH/<provider>/<fichier>)."""
+    base_path = Path(settings.download_path).resolve()
+    path = (base_path / provider_id / filename).resolve()
+    if (
+        provider_id not in PROVIDERS
+        or path.parent != base_path / provider_id
+        or not path.is_file()
+    ):
+        raise HTTPException(status_code=404, detail="Facture introuvable")
+    if settings.use_x_accel:
+        return _x_accel(path)
+    return FileResponse(path, filename=path.name)
+
+
 @app.get("/api/debug")
 async def debug_info() -> dict:
     """Endpoint de debug pour diagnostiquer les problèmes."""
@@ -586,7 +864,7 @@ async def debug_info() -> dict:
     if amazon:
         try:
             debug_info["driver_initialized"] = amazon._downloader.driver is not None
-            debug_info["2fa_required"] = amazon.is_2fa_required()
+            debug_info["2fa_required"] = await _is_2fa(amazon)
         except Exception as e:
             debug_info["driver_error"] = str(e)
     return debug_info
@@ -603,7 +881,7 @@ async def download_invoices(
     provider_id = (request.provider or "amazon").strip().lower()
     downloader = _get_downloader(provider_id)
     if not downloader:
-        if provider_id in PROVIDER_LABELS and provider_id not in PROVIDERS:
+        if provider_id in _NOT_IMPLEMENTED:
             raise HTTPException(
                 status_code=501,
                 detail=f"Le fournisseur '{provider_id}' n'est pas encore implémenté",
@@ -613,12 +891,41 @@ async def download_invoices(
             detail=f"Le fournisseur '{provider_id}' n'est pas configuré ou initialisé",
         )
 
-    progress_queue: asyncio.Queue[tuple[str, Any, Any, Any]] = asyncio.Queue()
+    # Canal mémoire borné : le flux SSE vide les événements en attente à chaque réveil
+    send_stream, receive_stream = anyio.create_memory_object_stream[
+        tuple[str, Any, Any, Any]
+    ](max_buffer_size=PROGRESS_BUFFER_SIZE)
+    last_progress: dict[str, Any] = {"key": None, "at": 0.0}
 
     async def on_progress(current: int, total: int, message: str) -> None:
-        await progress_queue.put(("progress", current, total, message))
+        # Même (current, total) à moins de 50 ms d'intervalle : seul le message change
+        now = time.monotonic()
+        if (
+            last_progress["key"] == (current, total)
+            and now - last_progress["at"] < PROGRESS_COALESCE_SECONDS
+        ):
+            return
+        last_progress["key"] = (current, total)
+        last_progress["at"] = now
+        item = ("progress", current, total, message)
+        try:
+            send_stream.send_nowait(item)
+        except anyio.WouldBlock:
+            # Canal plein : abandonner la progression la plus ancienne
+            try:
+                receive_stream.receive_nowait()
+            except anyio.WouldBlock:
+                pass
+            send_stream.send_nowait(item)
+        except (anyio.ClosedResourceError, anyio.BrokenResourceError):
+            # Client déconnecté : flux fermé, le téléchargement continue sans suivi
+            pass
 
-    async def run_download() -> None:
+    async def run_download() -> tuple[str, Any]:
+        """Exécute le téléchargement ; retourne l'événement terminal."""
+        # Ne pas fermer le driver après téléchargement : on garde la session ouverte
+        # pour réutiliser les cookies au prochain lancement (évite de se reconnecter).
+        # Le driver est fermé proprement à l'arrêt du backend (lifespan shutdown).
         try:
             result = await asyncio.wait_for(
                 downloader.download_invoices(
@@ -634,20 +941,44 @@ async def download_invoices(
                 ),
                 timeout=DOWNLOAD_TIMEOUT_SECONDS,
             )
-            await progress_queue.put(("done", result, None, None))
+            return ("done", result)
         except asyncio.TimeoutError:
-            await progress_queue.put(("error", "timeout", None, None))
+            return ("error", "timeout")
+        except OTPRequiredError as e:
+            logger.info("Téléchargement interrompu : %s", e)
+            return ("otp", str(e))
         except Exception as e:
             import traceback
 
             logger.error("Erreur lors du téléchargement: %s", e)
             logger.debug("Traceback: %s", traceback.format_exc())
-            await progress_queue.put(("error", str(e), None, None))
-        finally:
-            # Ne pas fermer le driver après téléchargement : on garde la session ouverte
-            # pour réutiliser les cookies au prochain lancement (évite de se reconnecter).
-            # Le driver est fermé proprement à l'arrêt du backend (lifespan shutdown).
-            pass
+            return ("error", str(e))
+
+    def progress_frame(item: tuple[str, Any, Any, Any]) -> bytes:
+        _, current, total, message = item
+        payload = _json_dumps(
+            {"current": current, "total": total, "message": message or ""}
+        )
+        return _SSE_PROGRESS + payload + _SSE_END
+
+    async def terminal_frame(kind: str, value: Any) -> bytes:
+        if kind == "done":
+            message = f"{value['count']} facture(s) téléchargée(s)"
+            # PDF revalidés sans changement (304) : rapportés à part, non comptés
+            unchanged = value.get("unchanged", 0)
+            if unchanged:
+                message += f", {unchanged} inchangée(s)"
+            data = {
+                "success": True,
+                "message": message,
+                "count": value["count"],
+                "unchanged": unchanged,
+                "files": value.get("files", []),
+            }
+            return _SSE_DONE + _json_dumps(data) + _SSE_END
+        is_2fa = kind == "otp" or (await _is_2fa(downloader) if downloader else False)
+        payload = _json_dumps({"detail": value or "Erreur", "requires_otp": is_2fa})
+        return _SSE_ERROR + payload + _SSE_END
 
     logger.info(
         "Démarrage téléchargement provider=%s max_invoices=%s year=%s month=%s otp=%s",
@@ -659,37 +990,36 @@ async def download_invoices(
     )
     task = asyncio.create_task(run_download())
 
-    async def event_stream() -> AsyncIterator[str]:
-        while True:
-            item = await progress_queue.get()
-            kind = item[0]
-            if kind == "progress":
-                _, current, total, message = item
-                payload = json.dumps(
-                    {"current": current, "total": total, "message": message or ""}
-                )
-                yield f"event: progress\ndata: {payload}\n\n"
-            elif kind == "done":
-                _, result, _, _ = item
-                data = {
-                    "success": True,
-                    "message": f"{result['count']} facture(s) téléchargée(s)",
-                    "count": result["count"],
-                    "files": result.get("files", []),
-                }
-                yield f"event: done\ndata: {json.dumps(data)}\n\n"
-                break
-            elif kind == "error":
-                _, err_msg, _, _ = item
-                is_2fa = "Code 2FA requis" in (err_msg or "") or (
-                    downloader.is_2fa_required() if downloader else False
-                )
-                payload = json.dumps(
-                    {"detail": err_msg or "Erreur", "requires_otp": is_2fa}
+    async def event_stream() -> AsyncIterator[bytes]:
+        get_task: Optional[asyncio.Task[Any]] = None
+        try:
+            while True:
+                if get_task is None:
+                    get_task = asyncio.ensure_future(receive_stream.receive())
+                # Réveil sur progression OU fin du téléchargement (événement final)
+                done, _ = await asyncio.wait(
+                    {task, get_task}, return_when=asyncio.FIRST_COMPLETED
                 )
-                yield f"event: error\ndata: {payload}\n\n"
-                break
-        await task  # consommer la tâche pour éviter warning
+                frames: list[bytes] = []
+                if get_task in done:
+                    frames.append(progress_frame(get_task.result()))
+                    get_task = None
+                # Vider le canal sans bloquer : un seul envoi par réveil
+                while True:
+                    try:
+                        frames.append(progress_frame(receive_stream.receive_nowait()))
+                    except anyio.WouldBlock:
+                        break
+                if task in done:
+                    frames.append(await terminal_frame(*task.result()))
+                    yield b"".join(frames)
+                    break
+                yield b"".join(frames)
+        finally:
+            if get_task is not None:
+                get_task.cancel()
+            send_stream.close()
+            receive_stream.close()
 
     return StreamingResponse(
         event_stream(),
@@ -711,7 +1041,7 @@ async def get_status() -> StatusResponse:
             status="error", message="Le téléchargeur n'est pas initialisé"
         )
     try:
-        if downloader.is_2fa_required():
+        if await _is_2fa(downloader):
             return StatusResponse(
                 status="otp_required",
                 message="Code 2FA requis - veuillez fournir le code OTP",
@@ -741,7 +1071,7 @@ async def submit_otp(request: OTPRequest) -> OTPResponse:
 
         if success:
             # Vérifier si la connexion est maintenant réussie
-            still_requires = downloader.is_2fa_required()
+            still_requires = await _is_2fa(downloader)
             return OTPResponse(
                 success=True,
                 message=(
@@ -765,22 +1095,21 @@ async def submit_otp(request: OTPRequest) -> OTPResponse:
 
 
 @app.get("/api/check-2fa", response_model=OTPResponse)
-async def check_2fa() -> OTPResponse:
+async def check_2fa() -> Any:
     """Vérifie si un code 2FA est requis."""
     downloader = _get_downloader("amazon")
     if not downloader:
         raise HTTPException(
             status_code=503, detail="Le téléchargeur n'est pas initialisé"
         )
-    requires_otp = downloader.is_2fa_required()
-    return OTPResponse(
-        success=not requires_otp,
-        message="Code 2FA requis" if requires_otp else "Aucun code 2FA requis",
-        requires_otp=requires_otp,
-    )
+    if not await _is_2fa(downloader):
+        # Cas courant : réponse pré-sérialisée
+        return Response(content=_NO_OTP_BYTES, media_type="application/json")
+    return OTPResponse(success=False, message="Code 2FA requis", requires_otp=True)
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8001)
+    # loop="auto" : uvloop si installé (Linux / macOS), sinon asyncio standard
+    uvicorn.run(app, host="0.0.0.0", port=8001, loop="auto")
@@ -2,29 +2,30 @@
 Providers de factures (V2 multi-fournisseurs).
 
 Chaque module dans ce package implémente InvoiceProviderProtocol.
-Le registre PROVIDERS liste les providers disponibles (implémentés + à venir).
+Le registre PROVIDERS liste les providers implémentés ; les classes (et donc
+Selenium / webdriver-manager) ne sont importées qu'à la demande via
+get_provider_cls(), pour ne pas alourdir le démarrage.
 """
 
-from backend.providers.amazon import AmazonProvider
-from backend.providers.base import InvoiceProviderProtocol, OrderInfo
-from backend.providers.bouygues import BouyguesProvider
-from backend.providers.decathlon import DecathlonProvider
-from backend.providers.fnac import FnacProvider
-from backend.providers.free_mobile import FreeMobileProvider
-from backend.providers.freebox import FreeboxProvider
-from backend.providers.orange import OrangeProvider
-from backend.providers.qobuz import QobuzProvider
-
-# Registre des providers implémentés : id -> classe
-PROVIDERS = {
-    AmazonProvider.PROVIDER_ID: AmazonProvider,
-    FreeboxProvider.PROVIDER_ID: FreeboxProvider,
-    FreeMobileProvider.PROVIDER_ID: FreeMobileProvider,
-    FnacProvider.PROVIDER_ID: FnacProvider,
-    BouyguesProvider.PROVIDER_ID: BouyguesProvider,
-    OrangeProvider.PROVIDER_ID: OrangeProvider,
-    DecathlonProvider.PROVIDER_ID: DecathlonProvider,
-    QobuzProvider.PROVIDER_ID: QobuzProvider,
+import importlib
+from typing import Any
+
+from backend.providers.base import (
+    InvoiceProviderProtocol,
+    OrderInfo,
+    OTPRequiredError,
+)
+
+# Registre des providers implémentés : id -> "module:Classe" (import paresseux)
+PROVIDERS: dict[str, str] = {
+    "amazon": "backend.providers.amazon:AmazonProvider",
+    "freebox": "backend.providers.freebox:FreeboxProvider",
+    "free_mobile": "backend.providers.free_mobile:FreeMobileProvider",
+    "fnac": "backend.providers.fnac:FnacProvider",
+    "bouygues": "backend.providers.bouygues:BouyguesProvider",
+    "orange": "backend.providers.orange:OrangeProvider",
+    "decathlon": "backend.providers.decathlon:DecathlonProvider",
+    "qobuz": "backend.providers.qobuz:QobuzProvider",
 }
 
 # Providers prévus (affichage frontend) : id -> libellé
@@ -40,9 +41,27 @@ PROVIDER_LABELS: dict[str, str] = {
     "leroy_merlin": "Leroy Merlin",
 }
 
+
+def get_provider_cls(provider_id: str) -> Any:
+    """Importe (au premier appel) et retourne la classe du provider demandé."""
+    module_name, _, class_name = PROVIDERS[provider_id].partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+# Compatibilité : `from backend.providers import AmazonProvider` reste possible
+_CLASS_TO_PROVIDER_ID = {path.partition(":")[2]: pid for pid, path in PROVIDERS.items()}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _CLASS_TO_PROVIDER_ID:
+        return get_provider_cls(_CLASS_TO_PROVIDER_ID[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     "InvoiceProviderProtocol",
     "OrderInfo",
+    "OTPRequiredError",
     "AmazonProvider",
     "FreeboxProvider",
     "FreeMobileProvider",
@@ -53,4 +72,5 @@ __all__ = [
     "QobuzProvider",
     "PROVIDERS",
     "PROVIDER_LABELS",
+    "get_provider_cls",
 ]
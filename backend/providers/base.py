@@ -8,6 +8,8 @@ permettre des implémentations par composition (wrapper) sans héritage forcé.
 
 from __future__ import annotations
 
+import asyncio
+import inspect
 from dataclasses import dataclass
 from datetime import date
 from typing import Any, Awaitable, Callable, Dict, List, Optional, Protocol, Union
@@ -16,6 +18,10 @@ from typing import Any, Awaitable, Callable, Dict, List, Optional, Protocol, Uni
 ProgressCallback = Optional[Callable[[int, int, str], Awaitable[None]]]
 
 
+class OTPRequiredError(Exception):
+    """Levée par un provider quand la connexion exige un code 2FA (OTP)."""
+
+
 @dataclass
 class OrderInfo:
     """Information minimale sur une commande/facture (pour list_orders_or_invoices)."""
@@ -26,6 +32,89 @@ class OrderInfo:
     raw_element: Any = None  # Élément DOM ou donnée brute selon le provider
 
 
+async def emit_progress(
+    on_progress: Optional[Callable[[int, int, str], Any]],
+    done: int,
+    total: int,
+    message: str,
+) -> None:
+    """Notifie la progression (callback sync ou async) ; ses erreurs sont ignorées."""
+    if not on_progress:
+        return
+    try:
+        result = on_progress(done, total, message)
+        if inspect.isawaitable(result):
+            await result
+    except Exception:
+        pass
+
+
+async def download_concurrently(
+    orders: List[OrderInfo],
+    download: Callable[[int, OrderInfo], Awaitable[Optional[str]]],
+    max_invoices: int,
+    max_workers: int,
+    on_progress: Optional[Callable[[int, int, str], Any]] = None,
+    pause: float = 1.0,
+) -> List[str]:
+    """
+    Télécharge les factures avec au plus max_workers appels download(i, order)
+    simultanés, et jamais plus qu'il n'en manque pour atteindre max_invoices.
+    La pause entre deux téléchargements reste par worker. Retourne les fichiers
+    obtenus, dans l'ordre d'arrivée.
+    """
+    total = min(len(orders), max_invoices)
+    files: List[str] = []
+    semaphore = asyncio.Semaphore(max(1, max_workers))
+    # Pas plus de téléchargements en cours qu'il ne manque de factures
+    slots = asyncio.Condition()
+    in_flight = 0
+
+    async def _bounded(i: int, order: OrderInfo) -> Optional[str]:
+        nonlocal in_flight
+        async with semaphore:
+            async with slots:
+                await slots.wait_for(
+                    lambda: in_flight == 0 or len(files) + in_flight < max_invoices
+                )
+                if len(files) >= max_invoices:
+                    return None
+                in_flight += 1
+            fn: Optional[str] = None
+            try:
+                await emit_progress(
+                    on_progress,
+                    len(files),
+                    total,
+                    f"Téléchargement facture {len(files) + 1}/{total}…",
+                )
+                fn = await download(i, order)
+            finally:
+                async with slots:
+                    in_flight -= 1
+                    if fn:
+                        files.append(fn)
+                    slots.notify_all()
+            await asyncio.sleep(pause)
+            return fn
+
+    tasks = [asyncio.create_task(_bounded(i, o)) for i, o in enumerate(orders)]
+    try:
+        # Progression rapportée dans l'ordre d'arrivée des téléchargements
+        for next_done in asyncio.as_completed(tasks):
+            if await next_done:
+                await emit_progress(
+                    on_progress,
+                    len(files),
+                    total,
+                    f"{len(files)}/{total} facture(s) téléchargée(s)",
+                )
+    finally:
+        for task in tasks:
+            task.cancel()
+    return files
+
+
 class InvoiceProviderProtocol(Protocol):
     """
     Contrat commun pour un fournisseur de factures.
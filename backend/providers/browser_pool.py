@@ -0,0 +1,77 @@
+"""
+Pool de navigateurs Selenium partagé entre providers.
+
+Un provider emprunte un driver à la connexion et le rend à la fin du
+téléchargement, erreur comprise (sauf 2FA en attente) : le provider suivant réutilise le navigateur déjà lancé
+(démarrage de plusieurs secondes et ~200 Mo évités) au lieu d'en ouvrir un autre.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserPool:
+    """
+    Pool LIFO de drivers Selenium inactifs.
+
+    Le driver rendu le plus récemment est réutilisé en premier (navigateur
+    « chaud », cookies de session encore présents). Les appels Selenium
+    bloquants (sonde current_url, quit) sont faits dans un thread.
+    """
+
+    def __init__(self, max_idle: int = 2, keep_browser_open: bool = False) -> None:
+        self.max_idle = max_idle
+        self.keep_browser_open = keep_browser_open
+        self._idle: asyncio.LifoQueue[Any] = asyncio.LifoQueue()
+
+    @staticmethod
+    def _is_alive(driver: Any) -> bool:
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(driver: Any) -> None:
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.debug("BrowserPool quit: %s", e)
+
+    async def acquire(self, factory: Callable[[], Any]) -> Any:
+        """Retourne un driver inactif, ou en crée un via factory (dans un thread)."""
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if await asyncio.to_thread(self._is_alive, driver):
+                logger.info("BrowserPool: réutilisation d'un navigateur déjà lancé")
+                return driver
+            await asyncio.to_thread(self._quit, driver)
+        return await asyncio.to_thread(factory)
+
+    async def release(self, driver: Any) -> None:
+        """Rend un driver au pool (fermé si le pool est déjà plein)."""
+        if driver is None:
+            return
+        if self._idle.qsize() >= self.max_idle:
+            await asyncio.to_thread(self._quit, driver)
+            return
+        self._idle.put_nowait(driver)
+
+    async def close(self) -> None:
+        """Ferme les navigateurs inactifs (sauf connexion continue)."""
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if not self.keep_browser_open:
+                await asyncio.to_thread(self._quit, driver)
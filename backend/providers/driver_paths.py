@@ -0,0 +1,86 @@
+"""
+Chemin des exécutables chromedriver / geckodriver, mis en cache.
+
+webdriver-manager interroge le réseau à chaque install() pour vérifier la
+version du driver : le chemin résolu est gardé en mémoire pour le processus et
+sur disque (7 jours) pour les lancements suivants. Un driver refusé par le
+navigateur (mise à jour automatique de Chrome…) est oublié avec
+invalidate_driver_path() puis résolu à nouveau.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DRIVER_CACHE_FILE = Path.home() / ".cache" / "get_invoices" / "driver_cache.json"
+DRIVER_CACHE_TTL_SECONDS = 7 * 86400
+
+
+def _read_disk_cache(browser: str) -> Optional[str]:
+    """Chemin enregistré pour ce navigateur s'il est récent et existe encore."""
+    try:
+        entry = json.loads(DRIVER_CACHE_FILE.read_text(encoding="utf-8"))[browser]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    path = entry.get("path")
+    if (
+        path
+        and time.time() - float(entry.get("mtime", 0)) < DRIVER_CACHE_TTL_SECONDS
+        and os.path.exists(path)
+    ):
+        return str(path)
+    return None
+
+
+def _write_disk_cache(browser: str, path: str) -> None:
+    try:
+        data = json.loads(DRIVER_CACHE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        data = {}
+    data[browser] = {"path": path, "mtime": time.time()}
+    try:
+        DRIVER_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        DRIVER_CACHE_FILE.write_text(json.dumps(data), encoding="utf-8")
+    except OSError as e:
+        logger.debug("Cache driver non écrit: %s", e)
+
+
+@lru_cache(maxsize=2)
+def resolve_driver_path(browser: str) -> str:
+    """Chemin du driver Selenium ("chrome" ou "firefox"), installé si besoin."""
+    cached = _read_disk_cache(browser)
+    if cached:
+        return cached
+    if browser == "firefox":
+        from webdriver_manager.firefox import GeckoDriverManager
+
+        path = GeckoDriverManager().install()
+    else:
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        path = ChromeDriverManager().install()
+    _write_disk_cache(browser, path)
+    return path
+
+
+def invalidate_driver_path(browser: str) -> None:
+    """Oublie le chemin en cache (mémoire et disque) du driver de ce navigateur."""
+    resolve_driver_path.cache_clear()
+    try:
+        data = json.loads(DRIVER_CACHE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return
+    if not isinstance(data, dict) or data.pop(browser, None) is None:
+        return
+    try:
+        DRIVER_CACHE_FILE.write_text(json.dumps(data), encoding="utf-8")
+    except OSError as e:
+        logger.debug("Cache driver non mis à jour: %s", e)
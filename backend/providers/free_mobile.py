@@ -6,16 +6,28 @@ Connexion : https://mobile.free.fr/account/v2/login
 
 from __future__ import annotations
 
+import asyncio
+import gzip
 import hashlib
 import logging
 import re
+import shutil
+import threading
 import time
 from datetime import date as date_type
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple, Union
+from urllib.parse import urljoin, urlparse, urlunparse
 
+import requests
+from requests.adapters import HTTPAdapter
 from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    SessionNotCreatedException,
+    TimeoutException,
+)
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.common.by import By
@@ -24,10 +36,14 @@ from selenium.webdriver.firefox.options import Options as FirefoxOptions
 from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
+from urllib3.util.retry import Retry
 
-from backend.providers.base import OrderInfo
+from backend.providers.base import OrderInfo, download_concurrently
+from backend.providers.browser_pool import BrowserPool
+from backend.providers.driver_paths import (
+    invalidate_driver_path,
+    resolve_driver_path,
+)
 from backend.services.invoice_registry import InvoiceRegistry
 
 logger = logging.getLogger(__name__)
@@ -53,6 +69,21 @@ _MOIS_FR = {
     "decembre": 12,
 }
 
+_MOIS_KEYS = tuple(_MOIS_FR)
+
+# Expressions régulières compilées une fois (parsing des dates et numéros de ligne)
+_MOIS_RE = re.compile(
+    r"(" + "|".join(re.escape(m) for m in _MOIS_FR) + r")\s+(\d{4})", re.I
+)
+_YM_RE = re.compile(r"(\d{4})[-/](\d{1,2})")
+_MY_RE = re.compile(r"(\d{1,2})/(\d{4})")
+_URL_YM_RE = re.compile(r"[/_\-](\d{4})[/_\-](\d{1,2})(?:[/_\-]|\.)")
+_URL_YEAR_RE = re.compile(r"[?&]year=(\d{4})", re.I)
+_URL_MONTH_RE = re.compile(r"[?&]month=(\d{1,2})", re.I)
+_PHONE_RE = re.compile(r"0[1-9][\s]?\d{2}[\s]?\d{2}[\s]?\d{2}[\s]?\d{2}")
+_NON_DIGIT_RE = re.compile(r"\D")
+_RECAP_RE = re.compile(r"\brecap\b")
+
 FREE_MOBILE_BASE_URL = "https://mobile.free.fr"
 FREE_MOBILE_LOGIN_URL = "https://mobile.free.fr/account/v2/login"
 # Chemins possibles vers les factures après connexion
@@ -63,6 +94,161 @@ FREE_MOBILE_FACTURATION_PATHS = [
     "/account/",
     "/",
 ]
+# Conteneurs du contenu principal (évite les liens du menu), par ordre de priorité
+_CONTENT_ROOT_SELECTORS = [
+    "[role='tabpanel']",
+    "main",
+    "[role='main']",
+    ".main-content",
+    "#content",
+    ".content",
+]
+
+# Condition d'URL d'un lien de facture (voir _is_invoice_download_link), appliquée
+# dans le navigateur sur l'URL résolue : seuls les candidats reviennent en Python.
+_INVOICE_HREF_PATTERN = r"\.pdf|facture|invoice"
+
+# Collecte en un seul aller-retour WebDriver les liens candidats de chaque conteneur
+# visible (arguments[0] = sélecteurs, arguments[1] = motif d'URL), avec texte, titre
+# et texte des 3 parents (dates).
+_HARVEST_LINKS_JS = """
+var visible = function (el) {
+    return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+};
+var roots = [];
+arguments[0].forEach(function (sel) {
+    var found = Array.prototype.find.call(document.querySelectorAll(sel), visible);
+    if (found) roots.push(found);
+});
+if (!roots.length) roots.push(document);
+var hrefRe = new RegExp(arguments[1], "i");
+return roots.map(function (root) {
+    var links = Array.prototype.filter.call(root.querySelectorAll("a[href]"),
+        function (a) { return hrefRe.test(a.href || ""); });
+    return links.map(function (a) {
+        var ctx = [];
+        for (var p = a.parentElement, i = 0; p && i < 3; p = p.parentElement, i++) {
+            ctx.push((p.innerText || "").trim().slice(0, 200));
+        }
+        return {
+            el: a,
+            href: (a.href || "").trim(),
+            text: (a.innerText || "").trim(),
+            title: (a.getAttribute("title") || "").trim(),
+            context: ctx.join(" "),
+        };
+    });
+});
+"""
+
+# Au moins un lien candidat de facture (arguments[0] = motif d'URL) ?
+_HAS_INVOICE_LINKS_JS = """
+var hrefRe = new RegExp(arguments[0], "i");
+return Array.prototype.some.call(document.querySelectorAll("a[href]"),
+    function (a) { return hrefRe.test(a.href || ""); });
+"""
+
+# Pauses successives (s) en attendant qu'une page soit prête
+_BACKOFF_SCHEDULE: Tuple[float, ...] = (0.05, 0.1, 0.2, 0.4, 0.8, 1.5, 3.0)
+
+# Formulaire de connexion affiché ? (champ mot de passe visible + libellé connexion).
+# Libellé cherché dans tout le HTML, comme page_source : <title>, value d'un submit…
+_LOGIN_STATE_JS = """
+var html = document.documentElement.outerHTML.toLowerCase();
+var hasVisiblePwd = Array.prototype.some.call(
+    document.querySelectorAll("input[type='password']"),
+    function (p) { return !!(p.offsetWidth || p.offsetHeight || p.getClientRects().length); }
+);
+return {
+    hasVisiblePwd: hasVisiblePwd,
+    hasLoginText: html.indexOf("se connecter") !== -1 || html.indexOf("connexion") !== -1,
+};
+"""
+
+# Éléments visibles correspondant à une expression XPath (arguments[0]) avec leur
+# texte (tronqué, longueur réelle dans len) et leur href, en un seul aller-retour.
+_VISIBLE_BY_XPATH_JS = """
+var snap = document.evaluate(arguments[0], document, null,
+    XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var out = [];
+for (var i = 0; i < snap.snapshotLength; i++) {
+    var el = snap.snapshotItem(i);
+    if (!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)) continue;
+    var text = (el.innerText || "").trim();
+    out.push({
+        el: el,
+        text: text.slice(0, 300),
+        len: text.length,
+        href: el.href || el.getAttribute("href") || "",
+    });
+}
+return out;
+"""
+
+# Premier élément visible et actif pour chaque liste de sélecteurs CSS (arguments[0..n])
+_FIRST_USABLE_INPUTS_JS = """
+function pick(selectors) {
+    for (var i = 0; i < selectors.length; i++) {
+        var els = document.querySelectorAll(selectors[i]);
+        for (var j = 0; j < els.length; j++) {
+            var el = els[j];
+            if (!el.disabled
+                && (el.offsetWidth || el.offsetHeight || el.getClientRects().length)) {
+                return el;
+            }
+        }
+    }
+    return null;
+}
+return Array.prototype.map.call(arguments, pick);
+"""
+
+# Liens <a> filtrés côté navigateur (%s : expression JS sur `a`), en un aller-retour
+_HARVEST_ANCHORS_JS = """
+return Array.from(document.querySelectorAll("a")).filter(function (a) {
+    return %s;
+}).map(function (a) {
+    return {
+        el: a,
+        href: a.href || "",
+        text: (a.innerText || "").trim(),
+        title: a.title || "",
+        visible: a.offsetParent !== null,
+    };
+});
+"""
+_FACTURE_ANCHOR_FILTER = "/factur/i.test(a.innerText) || /factur|pdf/i.test(a.href)"
+
+# Retour de download_invoice pour un PDF inchangé (304) : rien d'écrit sur le disque
+_UNCHANGED = "<inchangé>"
+
+
+def _invoice_order_id(norm_url: str) -> str:
+    """
+    Identifiant stable d'une facture (URL canonique) : identique d'un lancement à
+    l'autre, contrairement à hash(). Format inchangé pour rester compatible avec
+    les factures déjà enregistrées dans le registre.
+    """
+    return f"free_mobile_inv_{hashlib.md5(norm_url.encode()).hexdigest()[:12]}"
+
+
+# Connexions HTTP simultanées vers chromedriver/geckodriver (urllib3 en garde 1 par défaut)
+_COMMAND_POOL_MAXSIZE = 20
+
+
+def _widen_command_pool(driver: Any, maxsize: int = _COMMAND_POOL_MAXSIZE) -> Any:
+    """
+    Agrandit le pool urllib3 du client WebDriver : les onglets chargés en parallèle
+    et les attentes par polling ne se disputent plus une seule connexion.
+    Équivalent de ClientConfig(init_args_for_pool_manager=...), que les constructeurs
+    Chrome / Firefox n'acceptent pas selon la version de Selenium.
+    """
+    conn = getattr(getattr(driver, "command_executor", None), "_conn", None)
+    pool_kw = getattr(conn, "connection_pool_kw", None)
+    if conn is not None and isinstance(pool_kw, dict):
+        pool_kw["maxsize"] = maxsize
+        conn.clear()  # pools recréés à la prochaine commande avec la nouvelle taille
+    return driver
 
 
 class FreeMobileProvider:
@@ -84,6 +270,9 @@ class FreeMobileProvider:
         firefox_profile_path: Optional[str] = None,
         chrome_user_data_dir: Optional[str] = None,
         keep_browser_open: bool = False,
+        pool: Optional[BrowserPool] = None,
+        max_age_days: Optional[int] = None,
+        max_workers: int = 4,
     ) -> None:
         self._login = login
         self._password = password
@@ -97,15 +286,53 @@ class FreeMobileProvider:
         self.keep_browser_open = keep_browser_open
         self.driver: Optional[Union[webdriver.Chrome, webdriver.Firefox]] = None
         self.registry = InvoiceRegistry(self.download_path)
+        # Pool de navigateurs partagé (optionnel) : driver emprunté / rendu
+        self.pool = pool
+        # Au-delà de max_age_days, une facture enregistrée est re-téléchargée
+        self.max_age_days = max_age_days
+        # Téléchargements PDF simultanés dans download_invoices
+        self.max_workers = max(1, max_workers)
+        # Session HTTP des PDF, cookies copiés une fois après connexion : les
+        # workers de téléchargement ne touchent jamais au driver
+        self._http: Optional[Any] = None
 
     @property
     def provider_id(self) -> str:
         return self.PROVIDER_ID
 
+    async def _acquire_driver(self) -> Union[webdriver.Chrome, webdriver.Firefox]:
+        """Emprunte un navigateur au pool partagé, ou en lance un nouveau."""
+        if self.pool is not None:
+            driver: Union[webdriver.Chrome, webdriver.Firefox] = (
+                await self.pool.acquire(self._open_driver)
+            )
+            return driver
+        return await asyncio.to_thread(self._open_driver)
+
+    def _open_driver(self) -> Any:
+        """Nouveau navigateur, pool de connexions WebDriver élargi."""
+        return _widen_command_pool(self._setup_driver())
+
+    async def _release_driver(self) -> None:
+        """Rend le navigateur au pool (il reste ouvert pour le provider suivant)."""
+        if self.pool is not None and self.driver is not None:
+            await self.pool.release(self.driver)
+            self.driver = None
+
     def _setup_driver(self) -> Union[webdriver.Chrome, webdriver.Firefox]:
-        if self.browser == "firefox":
-            return self._setup_firefox()
-        return self._setup_chrome()
+        browser = "firefox" if self.browser == "firefox" else "chrome"
+        setup = self._setup_firefox if browser == "firefox" else self._setup_chrome
+        try:
+            return setup()
+        except SessionNotCreatedException as e:
+            # Driver en cache périmé (navigateur mis à jour) : nouvelle résolution
+            logger.warning(
+                "Free Mobile: driver %s refusé (%s), nouvelle résolution",
+                browser,
+                e.msg,
+            )
+            invalidate_driver_path(browser)
+            return setup()
 
     def _setup_chrome(self) -> webdriver.Chrome:
         opts = ChromeOptions()
@@ -113,6 +340,9 @@ class FreeMobileProvider:
             opts.add_argument("--headless")
         opts.add_argument("--no-sandbox")
         opts.add_argument("--disable-dev-shm-usage")
+        # driver.get() rend la main au DOMContentLoaded, sans attendre images et
+        # trackers : les listes chargées en JS sont attendues par _backoff_until.
+        opts.page_load_strategy = "eager"
         prefs = {
             "download.default_directory": str(self.download_path.absolute()),
             "download.prompt_for_download": False,
@@ -122,7 +352,7 @@ class FreeMobileProvider:
             opts.add_argument(
                 f"--user-data-dir={Path(self.chrome_user_data_dir).resolve()}"
             )
-        driver_path = ChromeDriverManager().install()
+        driver_path = resolve_driver_path("chrome")
         service = ChromeService(driver_path)
         return webdriver.Chrome(service=service, options=opts)
 
@@ -130,6 +360,7 @@ class FreeMobileProvider:
         opts = FirefoxOptions()
         if self.headless:
             opts.add_argument("--headless")
+        opts.page_load_strategy = "eager"
         if self.firefox_profile_path and Path(self.firefox_profile_path).exists():
             opts.profile = FirefoxProfile(self.firefox_profile_path)
         else:
@@ -142,9 +373,72 @@ class FreeMobileProvider:
                 "browser.helperApps.neverAsk.saveToDisk", "application/pdf"
             )
             opts.profile = profile
-        driver_path = GeckoDriverManager().install()
+        driver_path = resolve_driver_path("firefox")
         return webdriver.Firefox(service=FirefoxService(driver_path), options=opts)
 
+    def _wait_for(
+        self,
+        condition: Callable[[Any], Any],
+        timeout: Optional[float] = None,
+        poll: float = 0.2,
+    ) -> bool:
+        """Attend (polling du DOM) qu'une condition soit vraie ; False au timeout."""
+        if not self.driver:
+            return False
+        try:
+            WebDriverWait(
+                self.driver, timeout or self.timeout, poll_frequency=poll
+            ).until(condition)
+            return True
+        except TimeoutException:
+            return False
+
+    def _wait_page_ready(self, timeout: float = 10) -> bool:
+        """Attend que le DOM du document courant soit prêt (stratégie eager)."""
+        return self._wait_for(
+            lambda d: d.execute_script("return document.readyState")
+            in ("interactive", "complete"),
+            timeout,
+        )
+
+    def _backoff_until(
+        self,
+        predicate: Callable[[], bool],
+        schedule: Tuple[float, ...] = _BACKOFF_SCHEDULE,
+    ) -> bool:
+        """
+        Teste predicate avec des pauses croissantes : rend la main dès que la page
+        est prête (cas courant), sans attendre plus longtemps qu'une pause fixe.
+        """
+        for delay in schedule:
+            if predicate():
+                return True
+            time.sleep(delay)
+        return predicate()
+
+    def _has_invoice_links(self) -> bool:
+        """Vrai si la page contient au moins un lien candidat de facture."""
+        if not self.driver:
+            return False
+        try:
+            return bool(
+                self.driver.execute_script(_HAS_INVOICE_LINKS_JS, _INVOICE_HREF_PATTERN)
+            )
+        except Exception:
+            return False
+
+    def _visible_by_xpath(self, xpath: str) -> List[Dict[str, Any]]:
+        """Éléments visibles (el, text, len, href) pour un XPath, en un aller-retour."""
+        if not self.driver:
+            return []
+        return self.driver.execute_script(_VISIBLE_BY_XPATH_JS, xpath) or []
+
+    def _harvest_anchors(self, js_filter: str) -> List[Dict[str, Any]]:
+        """Liens (el, href, text, title, visible) satisfaisant js_filter, en un aller-retour."""
+        if not self.driver:
+            return []
+        return self.driver.execute_script(_HARVEST_ANCHORS_JS % js_filter) or []
+
     def _is_logged_in(self) -> bool:
         if not self.driver:
             return False
@@ -152,13 +446,10 @@ class FreeMobileProvider:
         if "mobile.free.fr" not in url:
             return False
         try:
-            body = self.driver.page_source.lower()
-            if "se connecter" in body or "connexion" in body:
-                pwd_fields = self.driver.find_elements(
-                    By.CSS_SELECTOR, "input[type='password']"
-                )
-                if pwd_fields and any(f.is_displayed() for f in pwd_fields):
-                    return False
+            # Un seul aller-retour, quelques octets (au lieu de tout page_source)
+            state = self.driver.execute_script(_LOGIN_STATE_JS) or {}
+            if state.get("hasVisiblePwd") and state.get("hasLoginText"):
+                return False
         except Exception:
             pass
         return True
@@ -166,13 +457,30 @@ class FreeMobileProvider:
     async def login(self, otp_code: Optional[str] = None) -> bool:
         try:
             if not self.driver:
-                self.driver = self._setup_driver()
+                self.driver = await self._acquire_driver()
+        except Exception as e:
+            return self._login_failed(e)
+        # Selenium est bloquant : exécuté dans un thread pour libérer la boucle asyncio
+        ok = await asyncio.to_thread(self._login_sync, otp_code)
+        if ok:
+            await asyncio.to_thread(self._refresh_http_session)
+        return ok
+
+    def _login_sync(self, otp_code: Optional[str] = None) -> bool:
+        if not self.driver:
+            return False
+        try:
             if self._is_logged_in():
                 logger.info("Free Mobile: déjà connecté")
                 return True
 
             self.driver.get(FREE_MOBILE_LOGIN_URL)
-            time.sleep(3)
+            self._wait_for(
+                EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, "input[type='password']")
+                ),
+                timeout=10,
+            )
 
             login_selectors = [
                 "input[name='login']",
@@ -183,7 +491,7 @@ class FreeMobileProvider:
                 "input[placeholder*='mail']",
                 "input[placeholder*='téléphone']",
                 "input[autocomplete='username']",
-                "input[type='text']:not([type='search'])",
+                "input[type='text']",
                 "input[type='email']",
             ]
             password_selectors = [
@@ -196,32 +504,11 @@ class FreeMobileProvider:
                 "input[type='password']",
             ]
 
-            login_input = None
-            pass_input = None
-            for sel in login_selectors:
-                try:
-                    el = self.driver.find_element(By.CSS_SELECTOR, sel)
-                    if el.is_displayed() and el.is_enabled():
-                        login_input = el
-                        break
-                except NoSuchElementException:
-                    continue
-            if login_input:
-                for sel in password_selectors:
-                    try:
-                        el = self.driver.find_element(By.CSS_SELECTOR, sel)
-                        if el.is_displayed() and el.is_enabled():
-                            pass_input = el
-                            break
-                    except NoSuchElementException:
-                        continue
-            if not pass_input:
-                try:
-                    pass_input = self.driver.find_element(
-                        By.CSS_SELECTOR, "input[type='password']"
-                    )
-                except NoSuchElementException:
-                    pass
+            # Un seul aller-retour : premier champ visible et actif par liste,
+            # dans l'ordre de priorité des sélecteurs
+            login_input, pass_input = self.driver.execute_script(
+                _FIRST_USABLE_INPUTS_JS, login_selectors, password_selectors
+            ) or (None, None)
 
             if not login_input or not pass_input:
                 logger.error(
@@ -270,34 +557,36 @@ class FreeMobileProvider:
                 return False
 
             # Attendre la connexion avec polling (max 30s)
-            for _ in range(15):
-                time.sleep(2)
-                if self._is_logged_in():
-                    logger.info("Free Mobile: connexion réussie")
-                    return True
+            if self._wait_for(lambda d: self._is_logged_in(), timeout=30, poll=0.5):
+                logger.info("Free Mobile: connexion réussie")
+                return True
             logger.warning(
                 "Free Mobile: connexion peut avoir échoué (vérifier identifiants)"
             )
             return False
         except Exception as e:
-            err_msg = str(e).lower()
-            if (
-                "dns" in err_msg
-                or "neterror" in err_msg
-                or "could not reach" in err_msg
-                or "offline" in err_msg
-                or "impossible de se connecter" in err_msg
-            ):
-                logger.error(
-                    "Free Mobile: problème réseau ou DNS (impossible de joindre mobile.free.fr). "
-                    "Vérifiez votre connexion internet, VPN, pare-feu, ou réessayez plus tard."
-                )
-                raise Exception(
-                    "Impossible de joindre mobile.free.fr (réseau ou DNS). "
-                    "Vérifiez votre connexion internet et que https://mobile.free.fr s’ouvre dans un navigateur."
-                ) from e
-            logger.error("Free Mobile login: %s", e)
-            return False
+            return self._login_failed(e)
+
+    def _login_failed(self, e: Exception) -> bool:
+        """Erreur réseau / DNS : exception explicite ; sinon échec de connexion (False)."""
+        err_msg = str(e).lower()
+        if (
+            "dns" in err_msg
+            or "neterror" in err_msg
+            or "could not reach" in err_msg
+            or "offline" in err_msg
+            or "impossible de se connecter" in err_msg
+        ):
+            logger.error(
+                "Free Mobile: problème réseau ou DNS (impossible de joindre mobile.free.fr). "
+                "Vérifiez votre connexion internet, VPN, pare-feu, ou réessayez plus tard."
+            )
+            raise Exception(
+                "Impossible de joindre mobile.free.fr (réseau ou DNS). "
+                "Vérifiez votre connexion internet et que https://mobile.free.fr s’ouvre dans un navigateur."
+            ) from e
+        logger.error("Free Mobile login: %s", e)
+        return False
 
     def _expand_mes_lignes_if_needed(self) -> bool:
         """Ouvre la section « MES LIGNES » en cliquant sur son en-tête, puis attend que les lignes soient visibles."""
@@ -312,28 +601,20 @@ class FreeMobileProvider:
                 "//*[contains(., 'MES LIGNES') and string-length(normalize-space(.)) < 80]",
             ]:
                 try:
-                    els = self.driver.find_elements(By.XPATH, xpath)
-                    for el in els:
-                        if not el.is_displayed():
-                            continue
+                    for item in self._visible_by_xpath(xpath):
+                        el = item["el"]
                         try:
                             el.click()
-                            time.sleep(2)
                             # Attendre que des liens de lignes (06/07) apparaissent en dessous
                             WebDriverWait(self.driver, 10).until(
                                 lambda d: len(
                                     [
                                         e
-                                        for e in d.find_elements(
-                                            By.XPATH,
-                                            "//*[contains(., '06') or contains(., '07')]",
-                                        )
-                                        if e.is_displayed()
-                                        and 10 < len((e.text or "").strip()) < 80
-                                        and re.search(
-                                            r"0[1-9][\s]?\d{2}[\s]?\d{2}[\s]?\d{2}[\s]?\d{2}",
-                                            (e.text or ""),
+                                        for e in self._visible_by_xpath(
+                                            "//*[contains(., '06') or contains(., '07')]"
                                         )
+                                        if 10 < e["len"] < 80
+                                        and _PHONE_RE.search(e["text"])
                                     ]
                                 )
                                 >= 2
@@ -349,17 +630,12 @@ class FreeMobileProvider:
                 except Exception:
                     continue
             # Fallback : un seul clic sur un élément contenant MES LIGNES puis attente
-            for el in self.driver.find_elements(
-                By.XPATH, "//*[contains(., 'MES LIGNES')]"
-            ):
-                if not el.is_displayed():
-                    continue
-                text = (el.text or "").strip()
-                if len(text) > 200:
+            for item in self._visible_by_xpath("//*[contains(., 'MES LIGNES')]"):
+                if item["len"] > 200:
                     continue
                 try:
-                    el.click()
-                    time.sleep(3)
+                    item["el"].click()
+                    self._wait_page_ready()
                     break
                 except Exception:
                     pass
@@ -374,96 +650,48 @@ class FreeMobileProvider:
             return []
         entries: List[Any] = []
         seen_phones: set[str] = set()
-        phone_re = re.compile(r"0[1-9][\s]?\d{2}[\s]?\d{2}[\s]?\d{2}[\s]?\d{2}")
         try:
-            # 1) Chercher dans un bloc contenant "MES LIGNES" ou "LIGNE PRINCIPALE" : tout lien/bouton avec un numéro 06/07
-            for xpath in [
-                "//*[contains(., 'MES LIGNES') or contains(., 'LIGNE PRINCIPALE') or contains(., 'LIGNES SECONDAIRES')]//a[contains(., '06') or contains(., '07')]",
-                "//*[contains(., 'MES LIGNES')]//*[self::a or self::button or @role='button'][contains(., '06') or contains(., '07')]",
-            ]:
-                for el in self.driver.find_elements(By.XPATH, xpath):
-                    try:
-                        if not el.is_displayed():
-                            continue
-                        text = (el.text or "").strip()
-                        if not text or len(text) > 120:
-                            continue
-                        if not phone_re.search(text):
-                            continue
-                        match = phone_re.search(text)
-                        phone = re.sub(r"\D", "", match.group(0))[:10] if match else ""
-                        if phone and phone not in seen_phones:
-                            seen_phones.add(phone)
-                            entries.append(el)
-                    except Exception:
-                        continue
-                if entries:
-                    break
-            # 2) Fallback : tous les liens de la page avec un numéro 06/07 et href compte/ligne (ou relatif)
+
+            def add_entry(item: Dict[str, Any], phone: str) -> None:
+                if phone and phone not in seen_phones:
+                    seen_phones.add(phone)
+                    entries.append(item["el"])
+
+            # 1) Dans un bloc "MES LIGNES" / "LIGNE PRINCIPALE" : lien/bouton avec un numéro 06/07
+            for item in self._visible_by_xpath(
+                "//*[contains(., 'MES LIGNES') or contains(., 'LIGNE PRINCIPALE')"
+                " or contains(., 'LIGNES SECONDAIRES')]"
+                "//*[self::a or self::button or @role='button']"
+                "[contains(., '06') or contains(., '07')]"
+            ):
+                match = _PHONE_RE.search(item["text"])
+                if match and item["len"] <= 120:
+                    add_entry(item, _NON_DIGIT_RE.sub("", match.group(0))[:10])
             if not entries:
-                for el in self.driver.find_elements(By.TAG_NAME, "a"):
-                    try:
-                        if not el.is_displayed():
-                            continue
-                        text = (el.text or "").strip()
-                        if not phone_re.search(text) or len(text) >= 80:
-                            continue
-                        href = el.get_attribute("href") or ""
-                        if (
-                            href.startswith("http")
-                            and "mobile.free.fr" not in href
-                            and "free.fr" not in href
-                        ):
-                            continue
-                        match = phone_re.search(text)
-                        phone = re.sub(r"\D", "", match.group(0))[:10] if match else ""
-                        if phone and phone not in seen_phones:
-                            seen_phones.add(phone)
-                            entries.append(el)
-                    except Exception:
+                # 2) Fallbacks sur les liens de la page : un seul parcours du DOM, puis
+                # critères du plus strict au plus large appliqués en Python.
+                anchors = self._visible_by_xpath("//a")
+                for item in anchors:
+                    match = _PHONE_RE.search(item["text"])
+                    href = item["href"]
+                    if not match or item["len"] >= 80:
                         continue
-            # 3) Fallback : liens avec account/ligne dans l'URL
-            if not entries:
-                for el in self.driver.find_elements(
-                    By.CSS_SELECTOR,
-                    "a[href*='account'], a[href*='ligne'], a[href*='line']",
-                ):
-                    try:
-                        if not el.is_displayed():
-                            continue
-                        text = (el.text or "").strip()
-                        if phone_re.search(text):
-                            match = phone_re.search(text)
-                            phone = (
-                                re.sub(r"\D", "", match.group(0))[:10] if match else ""
-                            )
-                            if not phone or phone in seen_phones:
-                                continue
-                            seen_phones.add(phone)
-                            entries.append(el)
-                    except Exception:
+                    if href.startswith("http") and "free.fr" not in href:
                         continue
-            if not entries:
-                for el in self.driver.find_elements(
-                    By.XPATH,
-                    "//a[contains(@href, 'account') or contains(@href, 'line')]",
-                ):
-                    try:
-                        if not el.is_displayed():
+                    add_entry(item, _NON_DIGIT_RE.sub("", match.group(0))[:10])
+                if not entries:
+                    for item in anchors:
+                        href = item["href"]
+                        if not any(k in href for k in ("account", "ligne", "line")):
                             continue
-                        text = (el.text or "").strip()
-                        if phone_re.search(text) or "06 " in text or "07 " in text:
-                            match = phone_re.search(text)
-                            phone = (
-                                re.sub(r"\D", "", match.group(0))[:10]
-                                if match
-                                else str(hash(el))[:10]
-                            )
-                            if phone not in seen_phones:
-                                seen_phones.add(phone)
-                                entries.append(el)
-                    except Exception:
-                        continue
+                        text = item["text"]
+                        match = _PHONE_RE.search(text)
+                        if match:
+                            add_entry(item, _NON_DIGIT_RE.sub("", match.group(0))[:10])
+                        elif ("account" in href or "line" in href) and (
+                            "06 " in text or "07 " in text
+                        ):
+                            add_entry(item, str(item["el"].id))
             logger.info(
                 "Free Mobile: %s ligne(s) trouvée(s) (MES LIGNES)", len(entries)
             )
@@ -472,17 +700,32 @@ class FreeMobileProvider:
         return entries
 
     def _save_debug_page(self, prefix: str = "free_mobile_debug") -> None:
-        """Sauvegarde le HTML de la page courante dans logs/ pour diagnostic."""
+        """
+        Sauvegarde le HTML de la page courante dans logs/<prefix>.html.gz pour diagnostic.
+        Seul page_source est lu ici ; compression et écriture se font dans un thread.
+        """
         if not self.driver:
             return
         try:
             log_dir = Path(__file__).resolve().parent.parent.parent / "logs"
             log_dir.mkdir(exist_ok=True)
-            path = log_dir / f"{prefix}.html"
-            path.write_text(self.driver.page_source, encoding="utf-8", errors="replace")
-            logger.info("Free Mobile: page sauvegardée %s", path)
+            path = log_dir / f"{prefix}.html.gz"
+            html = self.driver.page_source
         except Exception as e:
             logger.debug("Free Mobile save debug page: %s", e)
+            return
+
+        def _write() -> None:
+            try:
+                with gzip.open(
+                    path, "wt", encoding="utf-8", errors="replace", compresslevel=1
+                ) as f:
+                    f.write(html)
+                logger.info("Free Mobile: page sauvegardée %s", path)
+            except Exception as e:
+                logger.debug("Free Mobile save debug page: %s", e)
+
+        threading.Thread(target=_write, name="free-mobile-debug", daemon=True).start()
 
     def _click_conso_et_factures_if_present(self) -> None:
         """Ouvre le bloc « Conso et factures » dans le menu si présent."""
@@ -495,7 +738,12 @@ class FreeMobileProvider:
                 )
                 if link.is_displayed():
                     link.click()
-                    time.sleep(2)
+                    self._wait_for(
+                        EC.presence_of_element_located(
+                            (By.PARTIAL_LINK_TEXT, "Mes factures")
+                        ),
+                        timeout=5,
+                    )
             except NoSuchElementException:
                 pass
         except Exception:
@@ -507,7 +755,6 @@ class FreeMobileProvider:
             return False
         try:
             self._click_conso_et_factures_if_present()
-            time.sleep(1)
             # Cliquer sur l'onglet "Mes factures" (élément dont le texte est exactement ça)
             clicked = False
             for xpath in [
@@ -551,20 +798,12 @@ class FreeMobileProvider:
                 logger.warning("Free Mobile: onglet Mes factures non trouvé")
                 return False
             # Attendre que le contenu "Mes factures" soit chargé (lien de téléchargement facture/PDF)
-            try:
-                WebDriverWait(self.driver, 15).until(
-                    EC.presence_of_element_located(
-                        (
-                            By.XPATH,
-                            "//a[contains(@href, 'pdf') or contains(@href, 'facture') or contains(@href, 'document')]",
-                        )
-                    )
-                )
-            except TimeoutException:
+            if not self._backoff_until(
+                self._has_invoice_links, _BACKOFF_SCHEDULE + (3.0, 3.0, 3.0)
+            ):
                 logger.warning(
                     "Free Mobile: timeout en attendant la liste des factures après clic onglet"
                 )
-            time.sleep(2)
             logger.info("Free Mobile: onglet Mes factures ouvert")
             return True
         except Exception as e:
@@ -572,6 +811,9 @@ class FreeMobileProvider:
             return False
 
     async def navigate_to_invoices(self) -> bool:
+        return await asyncio.to_thread(self._navigate_to_invoices_sync)
+
+    def _navigate_to_invoices_sync(self) -> bool:
         if not self.driver:
             return False
         if self._is_logged_in() and "mobile.free.fr" in self.driver.current_url:
@@ -581,7 +823,6 @@ class FreeMobileProvider:
                     logger.warning(
                         "Free Mobile: impossible d'ouvrir l'onglet Mes factures"
                     )
-                time.sleep(2)
                 already = self.list_orders_or_invoices()
                 if already:
                     logger.info(
@@ -591,8 +832,12 @@ class FreeMobileProvider:
                     return True
         for path in FREE_MOBILE_FACTURATION_PATHS:
             url = FREE_MOBILE_BASE_URL.rstrip("/") + path
+            prev_url = self.driver.current_url
             self.driver.get(url)
-            time.sleep(3)
+            self._wait_for(EC.url_changes(prev_url), timeout=5)
+            self._wait_page_ready()
+            # Liste des factures souvent rendue en JS après le chargement (~3 s max)
+            self._backoff_until(self._has_invoice_links, _BACKOFF_SCHEDULE[:-1])
             if self._is_logged_in():
                 already = self.list_orders_or_invoices()
                 if not already and "/account" in self.driver.current_url:
@@ -601,16 +846,22 @@ class FreeMobileProvider:
                 if already:
                     return True
                 try:
-                    for link in self.driver.find_elements(By.TAG_NAME, "a"):
-                        href = (link.get_attribute("href") or "").lower()
-                        text = (link.text or "").lower()
-                        if "factur" in text or "factur" in href or "pdf" in href:
-                            link.click()
-                            time.sleep(3)
-                            if self.list_orders_or_invoices():
-                                return True
-                except Exception:
-                    pass
+                    links = self._harvest_anchors(_FACTURE_ANCHOR_FILTER)
+                except Exception as e:
+                    logger.debug("Free Mobile liens factures: %s", e)
+                    links = []
+                for link in links:
+                    # Un lien périmé (page déjà changée) n'interrompt pas les suivants
+                    try:
+                        link["el"].click()
+                        # readyState vaut encore « complete » sur l'ancienne page :
+                        # attendre qu'elle soit remplacée avant de la lire
+                        self._wait_for(EC.staleness_of(link["el"]), timeout=5)
+                        self._wait_page_ready()
+                        if self.list_orders_or_invoices():
+                            return True
+                    except Exception as e:
+                        logger.debug("Free Mobile lien facture: %s", e)
         return self._is_logged_in()
 
     def list_orders_or_invoices_from_all_lines(self) -> List[OrderInfo]:
@@ -618,14 +869,12 @@ class FreeMobileProvider:
         Parcourt les lignes rattachées (MES LIGNES : principale + secondaires),
         ouvre chaque ligne, affiche « Mes factures », et agrège tous les liens de factures.
         """
-        from urllib.parse import urljoin
-
         if not self.driver or not self._is_logged_in():
             return []
         # S’assurer d’être sur la page compte
         if "mobile.free.fr/account" not in self.driver.current_url:
             self.driver.get(FREE_MOBILE_BASE_URL.rstrip("/") + "/account/v2")
-            time.sleep(4)
+            self._wait_page_ready()
         # Attendre que la sidebar soit rendue (bloc MES LIGNES ou lien avec numéro)
         try:
             WebDriverWait(self.driver, 12).until(
@@ -639,7 +888,6 @@ class FreeMobileProvider:
         except TimeoutException:
             pass
         self._expand_mes_lignes_if_needed()
-        time.sleep(2)
         line_entries = self._get_line_entries()
         if not line_entries:
             logger.warning(
@@ -653,12 +901,22 @@ class FreeMobileProvider:
             )
         seen_hrefs: set[str] = set()
         all_orders: List[OrderInfo] = []
+        # Lignes avec une URL propre et distincte : ouvertes toutes ensemble dans des
+        # onglets (chargements en parallèle dans le navigateur), puis lues une à une.
+        # Sinon (sélection de ligne en JS) : parcours par clic puis retour arrière.
+        line_hrefs = [(el.get_attribute("href") or "").strip() for el in line_entries]
+        if (
+            line_hrefs
+            and len(set(line_hrefs)) == len(line_hrefs)
+            and all(h.startswith("http") and "#" not in h for h in line_hrefs)
+        ):
+            if self._collect_lines_in_tabs(line_hrefs, seen_hrefs, all_orders):
+                return all_orders
         num_lines = len(line_entries)
         for idx in range(num_lines):
             try:
                 # Re-récupérer les entrées à chaque tour (éviter stale après driver.back())
                 self._expand_mes_lignes_if_needed()
-                time.sleep(1)
                 current_entries = self._get_line_entries()
                 if idx >= len(current_entries):
                     logger.warning(
@@ -669,56 +927,103 @@ class FreeMobileProvider:
                     continue
                 line_el = current_entries[idx]
                 line_el.click()
-                time.sleep(3)
+                self._wait_for(EC.staleness_of(line_el), timeout=5)
+                self._wait_page_ready()
                 self._click_mes_factures_tab()
-                time.sleep(2)
-                base_url = self.driver.current_url
-                for o in self.list_orders_or_invoices():
-                    href = (o.invoice_url or "").strip()
-                    if not href:
-                        continue
-                    if not href.startswith("http") and base_url:
-                        href = urljoin(base_url, href)
-                    norm = self._normalize_invoice_url(href)
-                    if not norm or norm in seen_hrefs:
-                        continue
-                    seen_hrefs.add(norm)
-                    order_id = (
-                        f"free_mobile_inv_{hashlib.md5(norm.encode()).hexdigest()[:12]}"
-                    )
-                    all_orders.append(
-                        OrderInfo(
-                            order_id=order_id,
-                            invoice_url=href,
-                            invoice_date=o.invoice_date,
-                            raw_element=o.raw_element,
-                        )
-                    )
+                all_orders.extend(self._collect_line_invoices(seen_hrefs))
                 self.driver.back()
-                time.sleep(2)
+                self._wait_page_ready()
             except Exception as e:
                 logger.warning("Free Mobile ligne %s: %s", idx, e)
                 try:
                     self.driver.back()
-                    time.sleep(2)
+                    self._wait_page_ready()
                 except Exception:
                     pass
         return all_orders
 
+    def _collect_line_invoices(self, seen_hrefs: set[str]) -> List[OrderInfo]:
+        """Factures de la ligne affichée (onglet Mes factures), dédupliquées par URL."""
+        orders: List[OrderInfo] = []
+        base_url = self.driver.current_url if self.driver else ""
+        for o in self.list_orders_or_invoices():
+            href = (o.invoice_url or "").strip()
+            if not href:
+                continue
+            if not href.startswith("http") and base_url:
+                href = urljoin(base_url, href)
+            norm = self._normalize_invoice_url(href)
+            if not norm or norm in seen_hrefs:
+                continue
+            seen_hrefs.add(norm)
+            order_id = _invoice_order_id(norm)
+            orders.append(
+                OrderInfo(
+                    order_id=order_id,
+                    invoice_url=href,
+                    invoice_date=o.invoice_date,
+                    raw_element=o.raw_element,
+                )
+            )
+        return orders
+
+    def _collect_lines_in_tabs(
+        self, hrefs: List[str], seen_hrefs: set[str], all_orders: List[OrderInfo]
+    ) -> bool:
+        """
+        Ouvre chaque ligne dans un nouvel onglet d'un coup, puis lit ses factures.
+        Retourne False si les onglets n'ont pas pu être ouverts (popup bloquée).
+        """
+        if not self.driver:
+            return False
+        main_handle = self.driver.current_window_handle
+        known = set(self.driver.window_handles)
+        for href in hrefs:
+            self.driver.execute_script("window.open(arguments[0], '_blank');", href)
+        tabs = [h for h in self.driver.window_handles if h not in known]
+        if len(tabs) != len(hrefs):
+            self._close_tabs(tabs, main_handle)
+            return False
+        try:
+            for idx, handle in enumerate(tabs):
+                try:
+                    self.driver.switch_to.window(handle)
+                    self._wait_page_ready()
+                    self._click_mes_factures_tab()
+                    all_orders.extend(self._collect_line_invoices(seen_hrefs))
+                except Exception as e:
+                    logger.warning("Free Mobile ligne %s (onglet): %s", idx, e)
+        finally:
+            self._close_tabs(tabs, main_handle)
+        return True
+
+    def _close_tabs(self, handles: List[str], main_handle: str) -> None:
+        """Ferme les onglets ouverts pour les lignes et revient sur l'onglet principal."""
+        if not self.driver:
+            return
+        for handle in handles:
+            try:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            except Exception:
+                pass
+        self.driver.switch_to.window(main_handle)
+
     def _parse_invoice_date_from_title(self, title: str) -> Optional[date_type]:
         if not title:
             return None
         title_lower = title.lower()
-        for mois_name, mois_num in _MOIS_FR.items():
-            match = re.search(rf"{re.escape(mois_name)}\s+(\d{{4}})", title_lower)
-            if match:
-                try:
-                    year = int(match.group(1))
-                    if 2000 <= year <= 2100:
-                        return date_type(year, mois_num, 1)
-                except (ValueError, TypeError):
-                    pass
-        match = re.search(r"(\d{4})[-/](\d{1,2})", title)
+        # Préfiltre str.__contains__ : la regex des mois ne tourne que si utile
+        match = (
+            _MOIS_RE.search(title_lower)
+            if any(m in title_lower for m in _MOIS_KEYS)
+            else None
+        )
+        if match:
+            year = int(match.group(2))
+            if 2000 <= year <= 2100:
+                return date_type(year, _MOIS_FR[match.group(1)], 1)
+        match = _YM_RE.search(title)
         if match:
             try:
                 y, m = int(match.group(1)), int(match.group(2))
@@ -727,7 +1032,7 @@ class FreeMobileProvider:
             except (ValueError, TypeError):
                 pass
         # MM/AAAA ou JJ/MM/AAAA
-        match = re.search(r"(\d{1,2})/(\d{4})", title)
+        match = _MY_RE.search(title)
         if match:
             try:
                 m, y = int(match.group(1)), int(match.group(2))
@@ -742,7 +1047,7 @@ class FreeMobileProvider:
         if not href:
             return None
         # /2026/02/ ou /2026-02/ ou /facture_2026_02.pdf
-        match = re.search(r"[/_\-](\d{4})[/_\-](\d{1,2})(?:[/_\-]|\.)", href)
+        match = _URL_YM_RE.search(href)
         if match:
             try:
                 y, m = int(match.group(1)), int(match.group(2))
@@ -750,12 +1055,12 @@ class FreeMobileProvider:
                     return date_type(y, m, 1)
             except (ValueError, TypeError):
                 pass
-        match = re.search(r"[?&]year=(\d{4})", href, re.I)
+        match = _URL_YEAR_RE.search(href)
         if match:
             try:
                 year = int(match.group(1))
                 if 2000 <= year <= 2100:
-                    month_match = re.search(r"[?&]month=(\d{1,2})", href, re.I)
+                    month_match = _URL_MONTH_RE.search(href)
                     month = (
                         int(month_match.group(1))
                         if month_match and 1 <= int(month_match.group(1)) <= 12
@@ -776,8 +1081,6 @@ class FreeMobileProvider:
 
     def _normalize_invoice_url(self, url: str) -> str:
         """URL canonique pour déduplication (même facture avec paramètres différents)."""
-        from urllib.parse import urlparse, urlunparse
-
         if not url:
             return ""
         p = urlparse(url)
@@ -791,28 +1094,6 @@ class FreeMobileProvider:
             return (p.scheme or "https") + "://" + (p.netloc or "") + path
         return url.split("#")[0].split("?")[0]
 
-    def _get_date_from_context(self, el: Any) -> Optional[date_type]:
-        """Extrait une date du texte du lien et de son parent (ex. ligne de tableau)."""
-        try:
-            text_parts = [
-                (el.text or "").strip(),
-                (el.get_attribute("title") or "").strip(),
-            ]
-            parent = el
-            for _ in range(3):
-                try:
-                    parent = parent.find_element(By.XPATH, "..")
-                    if parent:
-                        text_parts.append((parent.text or "").strip()[:200])
-                except Exception:
-                    break
-            combined = " ".join(text_parts)
-            return self._parse_invoice_date_from_title(
-                combined
-            ) or self._parse_invoice_date_from_url((el.get_attribute("href") or ""))
-        except Exception:
-            return None
-
     def _is_invoice_download_link(
         self, el: Any, href: str, text: str, title: str
     ) -> bool:
@@ -827,7 +1108,7 @@ class FreeMobileProvider:
             return False
         if "récapitulatif" in href_lower or "recapitulatif" in href_lower:
             return False
-        if re.search(r"\brecap\b", label):
+        if _RECAP_RE.search(label):
             return False
         # Exclure tarifs (documents de grille tarifaire)
         if "tarif" in label or "tarif" in href_lower:
@@ -861,40 +1142,23 @@ class FreeMobileProvider:
 
     def list_orders_or_invoices(self) -> List[OrderInfo]:
         """Liste uniquement les liens de téléchargement de factures (onglet Mes factures)."""
-        from urllib.parse import urljoin
-
         out: List[OrderInfo] = []
         if not self.driver:
             return out
         try:
             base_url = self.driver.current_url
             seen_hrefs: set[str] = set()
-            # Chercher d'abord dans le contenu principal (tabpanel ou main) pour éviter le menu
-            root_candidates = []
-            try:
-                for sel in [
-                    "[role='tabpanel']",
-                    "main",
-                    "[role='main']",
-                    ".main-content",
-                    "#content",
-                    ".content",
-                ]:
-                    els = self.driver.find_elements(By.CSS_SELECTOR, sel)
-                    for el in els:
-                        if el.is_displayed():
-                            root_candidates.append(el)
-                            break
-            except Exception:
-                pass
-            roots = root_candidates if root_candidates else [self.driver]
-
-            for root in roots:
-                for a in root.find_elements(By.TAG_NAME, "a"):
-                    href = (a.get_attribute("href") or "").strip()
-                    text = (a.text or "").strip()
-                    title = (a.get_attribute("title") or "").strip()
-                    if not self._is_invoice_download_link(a, href, text, title):
+            # Un seul execute_script : liens du contenu principal (tabpanel, main…)
+            # pour éviter le menu, sinon de toute la page ; filtrage en Python.
+            groups = self.driver.execute_script(
+                _HARVEST_LINKS_JS, _CONTENT_ROOT_SELECTORS, _INVOICE_HREF_PATTERN
+            )
+            for links in groups or []:
+                for link in links:
+                    href, text, title = link["href"], link["text"], link["title"]
+                    if not self._is_invoice_download_link(
+                        link["el"], href, text, title
+                    ):
                         continue
                     full_href = (
                         urljoin(base_url, href) if not href.startswith("http") else href
@@ -903,20 +1167,19 @@ class FreeMobileProvider:
                     if not norm or norm in seen_hrefs:
                         continue
                     seen_hrefs.add(norm)
+                    # Date : titre du lien, URL, puis texte des parents (ligne de tableau)
                     inv_date = self._invoice_date_from_title_and_url(
                         title or text, full_href
+                    ) or self._parse_invoice_date_from_title(
+                        " ".join([text, title, link["context"]])
                     )
-                    if inv_date is None:
-                        inv_date = self._get_date_from_context(a)
-                    order_id = (
-                        f"free_mobile_inv_{hashlib.md5(norm.encode()).hexdigest()[:12]}"
-                    )
+                    order_id = _invoice_order_id(norm)
                     out.append(
                         OrderInfo(
                             order_id=order_id,
                             invoice_url=full_href,
                             invoice_date=inv_date,
-                            raw_element=a,
+                            raw_element=link["el"],
                         )
                     )
                 if out:
@@ -939,90 +1202,147 @@ class FreeMobileProvider:
         date_start_str: Optional[str] = None,
         date_end_str: Optional[str] = None,
     ) -> List[OrderInfo]:
-        from datetime import datetime
-
         if not any(
             [year is not None, month is not None, months, date_start_str, date_end_str]
         ):
             return orders
+        start_d: Optional[date_type] = None
+        end_d: Optional[date_type] = None
+        months_set: FrozenSet[int] = frozenset()
         if date_start_str and date_end_str:
             try:
                 start_d = datetime.strptime(date_start_str, "%Y-%m-%d").date()
                 end_d = datetime.strptime(date_end_str, "%Y-%m-%d").date()
             except ValueError:
                 return orders
-            return [
-                o
-                for o in orders
-                if o.invoice_date and start_d <= o.invoice_date <= end_d
-            ]
-        if year is not None and months:
-            return [
-                o
-                for o in orders
-                if o.invoice_date
-                and o.invoice_date.year == year
-                and o.invoice_date.month in months
-            ]
-        out: List[OrderInfo] = []
-        for o in orders:
-            if not o.invoice_date:
-                continue
-            if year is not None and o.invoice_date.year != year:
-                continue
-            if month is not None and o.invoice_date.month != month:
-                continue
-            out.append(o)
-        return out
+            # La plage prime sur année / mois
+            year = month = None
+        elif year is not None and months:
+            # Année + liste de mois : le mois seul est ignoré
+            months_set = frozenset(months)
+            month = None
 
-    def _get_browser_session(self) -> Any:
-        import requests
+        def keep(d: Optional[date_type]) -> bool:
+            return (
+                d is not None
+                and (year is None or d.year == year)
+                and (month is None or d.month == month)
+                and (not months_set or d.month in months_set)
+                and (start_d is None or start_d <= d)
+                and (end_d is None or d <= end_d)
+            )
+
+        return [o for o in orders if keep(o.invoice_date)]
 
-        session = requests.Session()
+    def _get_browser_session(self) -> Any:
+        """
+        Session HTTP réutilisée pour tous les PDF (keep-alive, pool de connexions,
+        reprise sur erreur 5xx), synchronisée avec les cookies du navigateur.
+        """
+        if self._http is None:
+            self._http = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=16,
+                pool_maxsize=32,
+                max_retries=Retry(
+                    total=3, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504)
+                ),
+            )
+            self._http.mount("http://", adapter)
+            self._http.mount("https://", adapter)
         for c in self.driver.get_cookies():
-            session.cookies.set(c["name"], c["value"], domain=c.get("domain", ""))
-        session.headers["User-Agent"] = self.driver.execute_script(
+            self._http.cookies.set(c["name"], c["value"], domain=c.get("domain", ""))
+        self._http.headers["User-Agent"] = self.driver.execute_script(
             "return navigator.userAgent;"
         )
-        return session
+        return self._http
+
+    def _refresh_http_session(self) -> None:
+        """Copie une fois les cookies du navigateur connecté dans la session HTTP."""
+        try:
+            self._get_browser_session()
+        except Exception as e:
+            logger.warning("Free Mobile session HTTP: %s", e)
+            if self._http is not None:
+                self._http.close()
+            self._http = None
 
     def _download_pdf(
-        self, url: str, order_id: str, invoice_date: Optional[date_type] = None
-    ) -> Optional[str]:
+        self,
+        url: str,
+        order_id: str,
+        invoice_date: Optional[date_type] = None,
+        cached: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Optional[str], Dict[str, str]]:
+        """
+        Télécharge le PDF ; retourne (nom du fichier, en-têtes ETag/Last-Modified).
+        cached : entrée du registre. Si elle porte un etag / last_modified, la requête
+        est conditionnelle et un 304 renvoie _UNCHANGED sans transfert.
+        """
+        headers: Dict[str, str] = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
         try:
-            session = self._get_browser_session()
-            r = session.get(url, timeout=30, allow_redirects=True)
-            if r.status_code != 200:
-                logger.warning(
-                    "Free Mobile download: URL retourne status %s (attendu 200) → %s",
-                    r.status_code,
-                    url[:80],
-                )
-                return None
-            ct = r.headers.get("content-type", "").lower()
-            is_pdf = "pdf" in ct or (len(r.content) >= 4 and r.content[:4] == b"%PDF")
-            if not is_pdf:
-                preview = (
-                    repr(r.content[:50]) if len(r.content) >= 50 else repr(r.content)
-                )
+            session = self._http
+            if session is None:
                 logger.warning(
-                    "Free Mobile download: contenu non-PDF (content-type=%s, début=%s) → %s",
-                    ct or "(vide)",
-                    preview,
-                    url[:80],
+                    "Free Mobile download: pas de session HTTP (connexion ?)"
                 )
-                return None
-            if invoice_date:
-                short_id = re.sub(r"[^\w\-]", "_", order_id)[:30]
-                name = f"free_mobile_{invoice_date.isoformat()}_{short_id}.pdf"
-            else:
-                name = f"free_mobile_{order_id}.pdf"
-            name = re.sub(r"[^\w\-.]", "_", name)[:80]
-            (self.download_path / name).write_bytes(r.content)
-            return name
+                return None, {}
+            with session.get(
+                url, headers=headers, timeout=30, allow_redirects=True, stream=True
+            ) as r:
+                if r.status_code == 304 and cached:
+                    logger.debug("Free Mobile: PDF inchangé (304) → %s", url[:80])
+                    return _UNCHANGED, {}
+                if r.status_code != 200:
+                    logger.warning(
+                        "Free Mobile download: URL retourne status %s (attendu 200) → %s",
+                        r.status_code,
+                        url[:80],
+                    )
+                    return None, {}
+                # Le PDF est copié tel quel vers le disque : seul le début est inspecté.
+                # decode_content : gzip/deflate éventuels décodés par urllib3.
+                r.raw.decode_content = True
+                first = r.raw.read(4096)
+                # Signature %PDF seule : le content-type est souvent faux (octet-stream…)
+                if not first.startswith(b"%PDF"):
+                    logger.warning(
+                        "Free Mobile download: contenu non-PDF (content-type=%s, début=%s) → %s",
+                        r.headers.get("content-type") or "(vide)",
+                        repr(first[:50]),
+                        url[:80],
+                    )
+                    return None, {}
+                if invoice_date:
+                    short_id = re.sub(r"[^\w\-]", "_", order_id)[:30]
+                    name = f"free_mobile_{invoice_date.isoformat()}_{short_id}.pdf"
+                else:
+                    name = f"free_mobile_{order_id}.pdf"
+                name = re.sub(r"[^\w\-.]", "_", name)[:80]
+                # Écrit sous .part puis renommé : une coupure réseau ne laisse pas
+                # de PDF tronqué sous le nom définitif
+                part = self.download_path / f"{name}.part"
+                try:
+                    with open(part, "wb") as f:
+                        f.write(first)
+                        shutil.copyfileobj(r.raw, f, length=64 * 1024)
+                    part.replace(self.download_path / name)
+                except BaseException:
+                    part.unlink(missing_ok=True)
+                    raise
+                validators = {
+                    "etag": r.headers.get("ETag", ""),
+                    "last_modified": r.headers.get("Last-Modified", ""),
+                }
+            return name, validators
         except Exception as e:
             logger.warning("Free Mobile download %s: %s", url[:60], e)
-            return None
+            return None, {}
 
     async def download_invoice(
         self,
@@ -1031,14 +1351,24 @@ class FreeMobileProvider:
         order_id: str = "",
         invoice_date: Optional[date_type] = None,
         force_redownload: bool = False,
+        skip_registry_check: bool = False,
     ) -> Optional[str]:
+        """
+        Télécharge une facture ; retourne le nom du fichier, _UNCHANGED (304) ou None.
+        skip_registry_check : registre déjà consulté par l'appelant (download_invoices).
+        Une facture déjà enregistrée (entrée expirée) est revalidée par GET
+        conditionnel — un 304 garde le fichier présent — sauf re-téléchargement
+        forcé par l'utilisateur, qui refait un GET complet.
+        """
         oid = order_id or (
             order_or_id.order_id
             if isinstance(order_or_id, OrderInfo)
             else str(order_or_id)
         )
-        if not force_redownload and self.registry.is_downloaded(
-            PROVIDER_FREE_MOBILE, oid
+        if (
+            not force_redownload
+            and not skip_registry_check
+            and self.registry.is_downloaded(PROVIDER_FREE_MOBILE, oid)
         ):
             logger.debug("Free Mobile: facture déjà enregistrée, ignorée: %s", oid)
             return None
@@ -1050,13 +1380,31 @@ class FreeMobileProvider:
         if not url:
             logger.warning("Free Mobile download_invoice: pas d'URL pour order %s", oid)
             return None
-        filename = self._download_pdf(url, oid, invoice_date)
-        if filename:
+        # Entrée expirée (max_age_days) : GET conditionnel sur les validateurs connus
+        cached = (
+            None
+            if force_redownload
+            else self.registry.get_entry(PROVIDER_FREE_MOBILE, oid)
+        )
+        filename, validators = await asyncio.to_thread(
+            self._download_pdf, url, oid, invoice_date, cached
+        )
+        if filename == _UNCHANGED and cached:
+            # Fichier déjà présent : l'entrée repart simplement pour max_age_days
+            self.registry.add(
+                PROVIDER_FREE_MOBILE,
+                oid,
+                cached["file_path"],
+                invoice_date=invoice_date.isoformat() if invoice_date else None,
+            )
+        elif filename:
             self.registry.add(
                 PROVIDER_FREE_MOBILE,
                 oid,
                 filename,
                 invoice_date=invoice_date.isoformat() if invoice_date else None,
+                etag=validators.get("etag"),
+                last_modified=validators.get("last_modified"),
             )
         return filename
 
@@ -1072,11 +1420,40 @@ class FreeMobileProvider:
         force_redownload: bool = False,
         on_progress: Optional[Callable[[int, int, str], Any]] = None,
     ) -> Dict[str, Union[List[str], int]]:
-        ok = await self.login(otp_code=otp_code)
-        if not ok:
-            raise Exception("Échec de la connexion à l'espace Free Mobile")
+        # Navigateur emprunté au pool le temps de cette seule opération
+        otp_pending = False
+        try:
+            if not await self.login(otp_code=otp_code):
+                # Écran 2FA : le navigateur reste emprunté pour submit_otp et la relance
+                otp_pending = await asyncio.to_thread(self.is_2fa_required)
+                raise Exception("Échec de la connexion à l'espace Free Mobile")
+            return await self._download_after_login(
+                max_invoices,
+                year=year,
+                month=month,
+                months=months,
+                date_start=date_start,
+                date_end=date_end,
+                force_redownload=force_redownload,
+                on_progress=on_progress,
+            )
+        finally:
+            if not otp_pending:
+                await self._release_driver()
+
+    async def _download_after_login(
+        self,
+        max_invoices: int,
+        year: Optional[int] = None,
+        month: Optional[int] = None,
+        months: Optional[List[int]] = None,
+        date_start: Optional[str] = None,
+        date_end: Optional[str] = None,
+        force_redownload: bool = False,
+        on_progress: Optional[Callable[[int, int, str], Any]] = None,
+    ) -> Dict[str, Union[List[str], int]]:
         # D’abord tenter de collecter les factures en parcourant chaque ligne rattachée (MES LIGNES)
-        orders = self.list_orders_or_invoices_from_all_lines()
+        orders = await asyncio.to_thread(self.list_orders_or_invoices_from_all_lines)
         if orders:
             logger.info(
                 "Free Mobile: %s facture(s) collectée(s) via MES LIGNES", len(orders)
@@ -1089,11 +1466,11 @@ class FreeMobileProvider:
                 raise Exception(
                     "Impossible d'accéder à la page des factures Free Mobile"
                 )
-            orders = self.list_orders_or_invoices()
+            orders = await asyncio.to_thread(self.list_orders_or_invoices)
         if not orders:
-            self._save_debug_page("free_mobile_no_links")
+            await asyncio.to_thread(self._save_debug_page, "free_mobile_no_links")
             logger.warning(
-                "Free Mobile: 0 facture trouvée. Page sauvegardée dans logs/free_mobile_no_links.html pour diagnostic."
+                "Free Mobile: 0 facture trouvée. Page sauvegardée dans logs/free_mobile_no_links.html.gz pour diagnostic."
             )
             return {"count": 0, "files": []}
 
@@ -1141,50 +1518,65 @@ class FreeMobileProvider:
             )
         filtered = deduped
 
-        total = min(len(filtered), max_invoices)
-        files: List[str] = []
-        count = 0
-        for i, order in enumerate(filtered):
-            if count >= max_invoices:
-                break
-            if on_progress:
-                try:
-                    cb = on_progress(
-                        count, total, f"Téléchargement facture {count + 1}/{total}…"
-                    )
-                    if hasattr(cb, "__await__"):
-                        await cb  # type: ignore[misc]
-                except Exception:
-                    pass
-            fn = await self.download_invoice(
+        # Factures déjà téléchargées : écartées en une seule lecture du registre
+        if not force_redownload:
+            known = self.registry.known_ids(
+                PROVIDER_FREE_MOBILE, max_age_days=self.max_age_days
+            )
+            pending = [o for o in filtered if o.order_id not in known]
+            if len(pending) < len(filtered):
+                logger.info(
+                    "Free Mobile: %s facture(s) déjà téléchargée(s), ignorée(s)",
+                    len(filtered) - len(pending),
+                )
+            filtered = pending
+
+        unchanged: List[str] = []
+
+        async def _download(i: int, order: OrderInfo) -> Optional[str]:
+            # Registre déjà consulté ci-dessus : pas de nouvelle lecture par facture
+            filename = await self.download_invoice(
                 order,
                 order_index=i,
                 order_id=order.order_id,
                 invoice_date=order.invoice_date,
                 force_redownload=force_redownload,
+                skip_registry_check=True,
+            )
+            if filename == _UNCHANGED:
+                # Inchangée (304) : ni comptée ni annoncée comme téléchargée
+                unchanged.append(order.order_id)
+                return None
+            return filename
+
+        if filtered and self._http is None:
+            raise Exception("Free Mobile: session HTTP indisponible après connexion")
+        # Téléchargements en parallèle (max_workers) ; la pause d'1 s reste par worker
+        files = await download_concurrently(
+            filtered, _download, max_invoices, self.max_workers, on_progress
+        )
+        count = len(files)
+        if count == 0 and not unchanged:
+            await asyncio.to_thread(
+                self._save_debug_page, "free_mobile_zero_downloaded"
             )
-            if fn:
-                files.append(fn)
-                count += 1
-                if on_progress:
-                    try:
-                        cb = on_progress(
-                            count, total, f"{count}/{total} facture(s) téléchargée(s)"
-                        )
-                        if hasattr(cb, "__await__"):
-                            await cb  # type: ignore[misc]
-                    except Exception:
-                        pass
-            time.sleep(1)
-        if count == 0:
-            self._save_debug_page("free_mobile_zero_downloaded")
             logger.warning(
-                "Free Mobile: 0 facture téléchargée au final. Page sauvegardée dans logs/free_mobile_zero_downloaded.html pour diagnostic."
+                "Free Mobile: 0 facture téléchargée au final. Page sauvegardée dans logs/free_mobile_zero_downloaded.html.gz pour diagnostic."
             )
-        logger.info("Free Mobile: %s facture(s) téléchargée(s)", count)
-        return {"count": count, "files": files}
+        logger.info(
+            "Free Mobile: %s facture(s) téléchargée(s), %s inchangée(s)",
+            count,
+            len(unchanged),
+        )
+        return {"count": count, "files": files, "unchanged": len(unchanged)}
 
     async def close(self) -> None:
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+        if self.pool is not None:
+            await self._release_driver()
+            return
         if self.driver and not self.keep_browser_open:
             self.driver.quit()
             self.driver = None
@@ -1202,6 +1594,10 @@ class FreeMobileProvider:
             return False
 
     async def submit_otp(self, otp_code: str) -> bool:
+        # Selenium est bloquant : exécuté dans un thread pour libérer la boucle asyncio
+        return await asyncio.to_thread(self._submit_otp_sync, otp_code)
+
+    def _submit_otp_sync(self, otp_code: str) -> bool:
         if not self.driver:
             return False
         try:
@@ -1211,11 +1607,16 @@ class FreeMobileProvider:
             )
             inp.clear()
             inp.send_keys(otp_code)
-            self.driver.find_element(
+            submit = self.driver.find_element(
                 By.CSS_SELECTOR, "input[type='submit'], button[type='submit']"
-            ).click()
-            time.sleep(4)
-            return self._is_logged_in()
+            )
+            submit.click()
+            # Le formulaire OTP disparaît une fois le code traité
+            self._wait_for(EC.staleness_of(submit), timeout=10)
+            if not self._is_logged_in():
+                return False
+            self._refresh_http_session()
+            return True
         except Exception as e:
             logger.warning("Free Mobile submit_otp: %s", e)
             return False
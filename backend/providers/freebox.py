@@ -5,16 +5,24 @@ Téléchargement des factures depuis l'espace client Freebox.
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import logging
 import re
-import time
+import shutil
 from datetime import date as date_type
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Union
+from urllib.parse import urljoin
 
+import requests
 from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    SessionNotCreatedException,
+    TimeoutException,
+)
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.common.by import By
@@ -23,10 +31,13 @@ from selenium.webdriver.firefox.options import Options as FirefoxOptions
 from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
 
-from backend.providers.base import OrderInfo
+from backend.providers.base import OrderInfo, download_concurrently
+from backend.providers.browser_pool import BrowserPool
+from backend.providers.driver_paths import (
+    invalidate_driver_path,
+    resolve_driver_path,
+)
 from backend.services.invoice_registry import InvoiceRegistry
 
 logger = logging.getLogger(__name__)
@@ -52,6 +63,118 @@ _MOIS_FR = {
     "decembre": 12,
 }
 
+# Expressions régulières compilées une fois (dates des titres, noms de fichiers)
+# Alternative des mois échappée une seule fois ; insensible à la casse, seul le
+# mois trouvé est mis en minuscules pour la recherche dans _MOIS_FR
+_MOIS_RE = re.compile(
+    r"(" + "|".join(re.escape(m) for m in _MOIS_FR) + r")\s+(\d{4})", re.I
+)
+_YM_RE = re.compile(r"(\d{4})[-/](\d{1,2})")
+_SANITIZE_ID = re.compile(r"[^\w\-]")
+_SANITIZE_NAME = re.compile(r"[^\w\-.]")
+
+# Liens de facture, par ordre de priorité : le premier sélecteur qui trouve gagne
+_INVOICE_SELECTORS = [
+    "a.btn.download[href*='facture']",
+    "a[href*='facture.pdf.pl']",
+    "a[href*='.pdf']",
+    "a[href*='facture']",
+    "a[href*='download']",
+    "a[href*='telecharger']",
+]
+# Un seul aller-retour WebDriver : liens (el, href, title, text) du premier sélecteur
+# (arguments[0]) qui en trouve, hors déconnexion, dédoublonnés par URL
+_HARVEST_INVOICE_LINKS_JS = """
+var sels = arguments[0];
+for (var i = 0; i < sels.length; i++) {
+    var out = [];
+    var seen = new Set();
+    document.querySelectorAll(sels[i]).forEach(function (a) {
+        var href = (a.href || "").trim();
+        if (!href || seen.has(href) || href.toLowerCase().indexOf("logout") !== -1) {
+            return;
+        }
+        seen.add(href);
+        out.push({el: a, href: href, title: a.title || "", text: a.innerText || ""});
+    });
+    if (out.length) return out;
+}
+return [];
+"""
+
+# État de la page de connexion, calculé côté navigateur (HTML complet, comme
+# page_source : le libellé « Se connecter » peut être la value d'un input submit)
+_LOGIN_STATE_JS = """
+var html = document.documentElement.outerHTML.toLowerCase();
+var hasVisiblePwd = Array.prototype.some.call(
+    document.querySelectorAll("input[type='password']"),
+    function (p) { return !!(p.offsetWidth || p.offsetHeight || p.getClientRects().length); }
+);
+return {
+    sessionInvalid: html.indexOf("session invalide") !== -1,
+    hasVisiblePwd: hasVisiblePwd,
+    hasLoginText: html.indexOf("se connecter") !== -1,
+};
+"""
+
+# Champs du formulaire de connexion (adsl.free.fr, moncompte.free.fr), par priorité
+_LOGIN_SELECTORS = [
+    "input[name='login']",
+    "input[name='identifiant']",
+    "input[id='login']",
+    "input[id='identifiant']",
+    "input[placeholder*='dentifiant']",
+    "input[autocomplete='username']",
+    "input[type='text']",
+    "input:not([type])",
+]
+_PASSWORD_SELECTORS = [
+    "input[name='pass']",
+    "input[name='password']",
+    "input[id='pass']",
+    "input[id='password']",
+    "input[placeholder*='mot de passe']",
+    "input[placeholder*='Password']",
+    "input[autocomplete='current-password']",
+    "input[type='password']",
+]
+_SUBMIT_SELECTORS = [
+    "input[type='submit'][value*='connecter']",
+    "input[type='submit']",
+    "button[type='submit']",
+]
+# Premier champ visible et actif de chaque liste (arguments[0..2]) ; pour le bouton,
+# repli sur un <button> « Se connecter » puis sur un lien a.btn de soumission
+_LOGIN_FORM_JS = """
+var usable = function (el) {
+    return !el.disabled
+        && !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+};
+var pick = function (selectors) {
+    for (var i = 0; i < selectors.length; i++) {
+        var found = Array.prototype.find.call(
+            document.querySelectorAll(selectors[i]), usable);
+        if (found) return found;
+    }
+    return null;
+};
+var connect = Array.prototype.find.call(document.querySelectorAll("button"),
+    function (b) { return /connecter/i.test(b.innerText || ""); });
+return [
+    pick(arguments[0]),
+    pick(arguments[1]),
+    pick(arguments[2]) || connect || pick(["a.btn[href*='submit']"])
+        || document.querySelector("input[type='submit'], button[type='submit']"),
+];
+"""
+
+# Premier lien dont le texte ou l'URL mentionne une facture (un seul aller-retour)
+_FIRST_FACTURE_LINK_JS = """
+return Array.prototype.find.call(document.querySelectorAll("a"), function (a) {
+    return /factur/i.test((a.innerText || "") + " " + (a.href || ""));
+}) || null;
+"""
+
 # URLs Espace abonné Freebox (adsl.free.fr et moncompte.free.fr)
 FREEBOX_LOGIN_URLS = [
     "https://adsl.free.fr/",
@@ -66,6 +189,17 @@ FREEBOX_FACTURATION_PATHS = [
     "/home.pl",
     "/",
 ]
+# Chemin de FREEBOX_FACTURATION_PATHS ayant listé des factures (dans download_path)
+_LAST_INVOICE_PATH_FILE = ".freebox_invoice_path"
+
+
+def _invoice_order_id(href: str) -> str:
+    """
+    Identifiant stable d'une facture (URL) : identique d'un lancement à l'autre,
+    contrairement à hash() (salé par PYTHONHASHSEED). Format inchangé pour rester
+    compatible avec les factures déjà enregistrées dans le registre.
+    """
+    return f"freebox_inv_{hashlib.md5(href.encode()).hexdigest()[:12]}"
 
 
 class FreeboxProvider:
@@ -87,6 +221,8 @@ class FreeboxProvider:
         firefox_profile_path: Optional[str] = None,
         chrome_user_data_dir: Optional[str] = None,
         keep_browser_open: bool = False,
+        pool: Optional[BrowserPool] = None,
+        max_workers: int = 4,
     ) -> None:
         self._login = login
         self._password = password
@@ -100,15 +236,44 @@ class FreeboxProvider:
         self.keep_browser_open = keep_browser_open
         self.driver: Optional[Union[webdriver.Chrome, webdriver.Firefox]] = None
         self.registry = InvoiceRegistry(self.download_path)
+        # Pool de navigateurs partagé (optionnel) : driver emprunté / rendu
+        self.pool = pool
+        # Session HTTP (cookies du navigateur) créée après connexion, réutilisée par PDF
+        self._http: Optional[Any] = None
+        # Téléchargements PDF simultanés dans download_invoices
+        self.max_workers = max(1, max_workers)
 
     @property
     def provider_id(self) -> str:
         return self.PROVIDER_ID
 
+    async def _acquire_driver(self) -> Union[webdriver.Chrome, webdriver.Firefox]:
+        """Emprunte un navigateur au pool partagé, ou en lance un nouveau."""
+        if self.pool is not None:
+            driver: Union[webdriver.Chrome, webdriver.Firefox] = (
+                await self.pool.acquire(self._setup_driver)
+            )
+            return driver
+        return await asyncio.to_thread(self._setup_driver)
+
+    async def _release_driver(self) -> None:
+        """Rend le navigateur au pool (il reste ouvert pour le provider suivant)."""
+        if self.pool is not None and self.driver is not None:
+            await self.pool.release(self.driver)
+            self.driver = None
+
     def _setup_driver(self) -> Union[webdriver.Chrome, webdriver.Firefox]:
-        if self.browser == "firefox":
-            return self._setup_firefox()
-        return self._setup_chrome()
+        browser = "firefox" if self.browser == "firefox" else "chrome"
+        setup = self._setup_firefox if browser == "firefox" else self._setup_chrome
+        try:
+            return setup()
+        except SessionNotCreatedException as e:
+            # Driver en cache périmé (navigateur mis à jour) : nouvelle résolution
+            logger.warning(
+                "Freebox: driver %s refusé (%s), nouvelle résolution", browser, e.msg
+            )
+            invalidate_driver_path(browser)
+            return setup()
 
     def _setup_chrome(self) -> webdriver.Chrome:
         opts = ChromeOptions()
@@ -125,7 +290,7 @@ class FreeboxProvider:
             opts.add_argument(
                 f"--user-data-dir={Path(self.chrome_user_data_dir).resolve()}"
             )
-        driver_path = ChromeDriverManager().install()
+        driver_path = resolve_driver_path("chrome")
         service = ChromeService(driver_path)
         return webdriver.Chrome(service=service, options=opts)
 
@@ -145,9 +310,26 @@ class FreeboxProvider:
                 "browser.helperApps.neverAsk.saveToDisk", "application/pdf"
             )
             opts.profile = profile
-        driver_path = GeckoDriverManager().install()
+        driver_path = resolve_driver_path("firefox")
         return webdriver.Firefox(service=FirefoxService(driver_path), options=opts)
 
+    def _wait_for(
+        self,
+        condition: Callable[[Any], Any],
+        timeout: Optional[float] = None,
+        poll: float = 0.2,
+    ) -> bool:
+        """Attend (polling du DOM) qu'une condition soit vraie ; False au timeout."""
+        if not self.driver:
+            return False
+        try:
+            WebDriverWait(
+                self.driver, timeout or self.timeout, poll_frequency=poll
+            ).until(condition)
+            return True
+        except TimeoutException:
+            return False
+
     def _is_logged_in(self) -> bool:
         if not self.driver:
             return False
@@ -156,16 +338,12 @@ class FreeboxProvider:
             return False
         # Non connecté : page affiche "Session invalide" + formulaire (Identifiant, Mot de passe, Se connecter)
         try:
-            body = self.driver.page_source.lower()
-            if "session invalide" in body:
+            # Recherche faite dans le navigateur : quelques octets au lieu de page_source
+            state = self.driver.execute_script(_LOGIN_STATE_JS) or {}
+            if state.get("sessionInvalid"):
+                return False
+            if state.get("hasVisiblePwd") and state.get("hasLoginText"):
                 return False
-            # Formulaire de login encore visible ?
-            pwd_fields = self.driver.find_elements(
-                By.CSS_SELECTOR, "input[type='password']"
-            )
-            if pwd_fields and any(f.is_displayed() for f in pwd_fields):
-                if "se connecter" in body:
-                    return False
         except Exception:
             pass
         return True
@@ -173,83 +351,39 @@ class FreeboxProvider:
     async def login(self, otp_code: Optional[str] = None) -> bool:
         try:
             if not self.driver:
-                self.driver = self._setup_driver()
+                self.driver = await self._acquire_driver()
+        except Exception as e:
+            logger.error("Freebox login: %s", e)
+            return False
+        # Selenium est bloquant : exécuté dans un thread pour libérer la boucle asyncio
+        return await asyncio.to_thread(self._login_sync, otp_code)
+
+    def _login_sync(self, otp_code: Optional[str] = None) -> bool:
+        if not self.driver:
+            return False
+        try:
             if self._is_logged_in():
                 logger.info("Freebox: déjà connecté")
+                self._refresh_http_session()
                 return True
 
-            login_input = None
-            pass_input = None
+            login_input = pass_input = submit = None
             for login_url in FREEBOX_LOGIN_URLS:
                 self.driver.get(login_url)
-                time.sleep(3)
-                if (
-                    "home.pl" not in self.driver.current_url
-                    and "free.fr" in self.driver.current_url
-                ):
-                    time.sleep(2)
-
-                # Sélecteurs pour le champ identifiant (adsl.free.fr, moncompte.free.fr)
-                login_selectors = [
-                    "input[name='login']",
-                    "input[name='identifiant']",
-                    "input[id='login']",
-                    "input[id='identifiant']",
-                    "input[placeholder*='dentifiant']",
-                    "input[autocomplete='username']",
-                    "input[type='text']:not([type='search'])",
-                ]
-                password_selectors = [
-                    "input[name='pass']",
-                    "input[name='password']",
-                    "input[id='pass']",
-                    "input[id='password']",
-                    "input[placeholder*='mot de passe']",
-                    "input[placeholder*='Password']",
-                    "input[autocomplete='current-password']",
-                    "input[type='password']",
-                ]
-
-                for sel in login_selectors:
-                    try:
-                        el = self.driver.find_element(By.CSS_SELECTOR, sel)
-                        if el.is_displayed() and el.is_enabled():
-                            login_input = el
-                            break
-                    except NoSuchElementException:
-                        continue
-                if login_input:
-                    for sel in password_selectors:
-                        try:
-                            el = self.driver.find_element(By.CSS_SELECTOR, sel)
-                            if el.is_displayed() and el.is_enabled():
-                                pass_input = el
-                                break
-                        except NoSuchElementException:
-                            continue
-                if login_input and pass_input:
-                    break
-                # XPath de secours : input précédé d'un label contenant "dentifiant" ou "login"
-                if not login_input:
-                    try:
-                        for el in self.driver.find_elements(
-                            By.XPATH, "//input[@type='text' or not(@type)]"
-                        ):
-                            if (
-                                el.is_displayed()
-                                and el.get_attribute("type") != "search"
-                            ):
-                                login_input = el
-                                break
-                    except Exception:
-                        pass
-                if not pass_input:
-                    try:
-                        pass_input = self.driver.find_element(
-                            By.CSS_SELECTOR, "input[type='password']"
-                        )
-                    except NoSuchElementException:
-                        pass
+                # Formulaire affiché, ou redirection vers home.pl (session encore valide)
+                self._wait_for(
+                    lambda d: "home.pl" in d.current_url
+                    or d.find_elements(By.CSS_SELECTOR, "input[type='password']"),
+                    timeout=10,
+                )
+
+                # Un seul aller-retour : identifiant, mot de passe et bouton de connexion
+                login_input, pass_input, submit = self.driver.execute_script(
+                    _LOGIN_FORM_JS,
+                    _LOGIN_SELECTORS,
+                    _PASSWORD_SELECTORS,
+                    _SUBMIT_SELECTORS,
+                ) or (None, None, None)
                 if login_input and pass_input:
                     break
 
@@ -268,35 +402,12 @@ class FreeboxProvider:
             pass_input.clear()
             pass_input.send_keys(self._password)
 
-            submit_selectors = [
-                "input[type='submit'][value*='connecter']",
-                "input[type='submit']",
-                "button[type='submit']",
-                "button:contains('Se connecter')",
-                "a.btn[href*='submit']",
-            ]
-            submit = None
-            for sel in submit_selectors:
-                try:
-                    if ":contains" in sel:
-                        for btn in self.driver.find_elements(By.TAG_NAME, "button"):
-                            if "connecter" in (btn.text or "").lower():
-                                submit = btn
-                                break
-                        if submit:
-                            break
-                    else:
-                        submit = self.driver.find_element(By.CSS_SELECTOR, sel)
-                        if submit.is_displayed():
-                            break
-                except NoSuchElementException:
-                    continue
             if not submit:
-                submit = self.driver.find_element(
-                    By.CSS_SELECTOR, "input[type='submit'], button[type='submit']"
-                )
+                logger.error("Freebox: bouton de connexion non trouvé")
+                return False
             submit.click()
-            time.sleep(4)
+            # La page de connexion est remplacée une fois le formulaire traité
+            self._wait_for(EC.staleness_of(submit), timeout=10)
 
             if not self._is_logged_in():
                 logger.warning(
@@ -304,12 +415,16 @@ class FreeboxProvider:
                 )
                 return False
             logger.info("Freebox: connexion réussie")
+            self._refresh_http_session()
             return True
         except Exception as e:
             logger.error("Freebox login: %s", e)
             return False
 
     async def navigate_to_invoices(self) -> bool:
+        return await asyncio.to_thread(self._navigate_to_invoices_sync)
+
+    def _navigate_to_invoices_sync(self) -> bool:
         if not self.driver:
             return False
         # Si déjà connecté et sur free.fr, vérifier si la page actuelle affiche déjà "Mes factures" (ex. home.pl)
@@ -320,45 +435,65 @@ class FreeboxProvider:
                     "Freebox: déjà sur la page des factures (%s lien(s))", len(already)
                 )
                 return True
-        # Sinon naviguer vers une page de facturation
-        for path in FREEBOX_FACTURATION_PATHS:
+        # Sinon naviguer vers une page de facturation (d'abord celle du dernier lancement)
+        last_path = self._load_last_invoice_path()
+        paths = FREEBOX_FACTURATION_PATHS
+        if last_path in paths:
+            paths = [last_path] + [p for p in paths if p != last_path]
+        for path in paths:
             url = FREEBOX_BASE_URL.rstrip("/") + path
             self.driver.get(url)
-            time.sleep(3)
+            self._wait_for(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "a[href*='facture']")),
+                timeout=3,
+            )
             if self._is_logged_in():
                 already = self.list_orders_or_invoices()
                 if already:
+                    if path != last_path:
+                        self._save_last_invoice_path(path)
                     return True
                 try:
-                    for link in self.driver.find_elements(By.TAG_NAME, "a"):
-                        href = (link.get_attribute("href") or "").lower()
-                        text = (link.text or "").lower()
-                        if "factur" in text or "factur" in href:
-                            link.click()
-                            time.sleep(3)
-                            break
+                    link = self.driver.execute_script(_FIRST_FACTURE_LINK_JS)
+                    if link:
+                        link.click()
+                        self._wait_for(EC.staleness_of(link), timeout=5)
                 except Exception:
                     pass
                 return True
         return self._is_logged_in()
 
+    def _load_last_invoice_path(self) -> Optional[str]:
+        """Chemin de facturation qui a fonctionné au lancement précédent."""
+        try:
+            path = (self.download_path / _LAST_INVOICE_PATH_FILE).read_text(
+                encoding="utf-8"
+            )
+        except OSError:
+            return None
+        return path.strip() or None
+
+    def _save_last_invoice_path(self, path: str) -> None:
+        try:
+            (self.download_path / _LAST_INVOICE_PATH_FILE).write_text(
+                path, encoding="utf-8"
+            )
+        except OSError as e:
+            logger.debug("Freebox: chemin des factures non enregistré: %s", e)
+
     def _parse_invoice_date_from_title(self, title: str) -> Optional[date_type]:
         """Parse la date de facture depuis le titre (ex. 'Télécharger... facture de février 2026')."""
         if not title:
             return None
-        title_lower = title.lower()
         # "facture de février 2026" ou "février 2026"
-        for mois_name, mois_num in _MOIS_FR.items():
-            match = re.search(rf"{re.escape(mois_name)}\s+(\d{{4}})", title_lower)
-            if match:
-                try:
-                    year = int(match.group(1))
-                    if 2000 <= year <= 2100:
-                        return date_type(year, mois_num, 1)
-                except (ValueError, TypeError):
-                    pass
+        match = _MOIS_RE.search(title)
+        if match:
+            year = int(match.group(2))
+            mois = _MOIS_FR.get(match.group(1).lower())
+            if mois and 2000 <= year <= 2100:
+                return date_type(year, mois, 1)
         # "2026-02" ou "02/2026"
-        match = re.search(r"(\d{4})[-/](\d{1,2})", title)
+        match = _YM_RE.search(title)
         if match:
             try:
                 y, m = int(match.group(1)), int(match.group(2))
@@ -370,48 +505,33 @@ class FreeboxProvider:
 
     def list_orders_or_invoices(self) -> List[OrderInfo]:
         """Liste les factures visibles (liens facture.pdf.pl ou PDF / téléchargement) avec date parsée."""
-        from urllib.parse import urljoin
-
         out: List[OrderInfo] = []
         if not self.driver:
             return out
         try:
             base_url = self.driver.current_url
-            selectors = [
-                "a.btn.download[href*='facture']",
-                "a[href*='facture.pdf.pl']",
-                "a[href*='.pdf']",
-                "a[href*='facture']",
-                "a[href*='download']",
-                "a[href*='telecharger']",
-            ]
-            seen_hrefs: set[str] = set()
-            for selector in selectors:
-                links = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                for i, a in enumerate(links):
-                    href = (a.get_attribute("href") or "").strip()
-                    if not href or "logout" in href.lower():
-                        continue
-                    if href in seen_hrefs:
-                        continue
-                    seen_hrefs.add(href)
-                    if not href.startswith("http"):
-                        href = urljoin(base_url, href)
-                    title = (a.get_attribute("title") or a.text or "").strip()
-                    inv_date = self._parse_invoice_date_from_title(title)
-                    order_id = (
-                        f"freebox_inv_{hashlib.md5(href.encode()).hexdigest()[:12]}"
-                    )
-                    out.append(
-                        OrderInfo(
-                            order_id=order_id,
-                            invoice_url=href,
-                            invoice_date=inv_date,
-                            raw_element=a,
-                        )
+            rows = (
+                self.driver.execute_script(
+                    _HARVEST_INVOICE_LINKS_JS, _INVOICE_SELECTORS
+                )
+                or []
+            )
+            # Liens déjà dédoublonnés côté navigateur
+            for row in rows:
+                href = row["href"]
+                if not href.startswith("http"):
+                    href = urljoin(base_url, href)
+                title = (row["title"] or row["text"] or "").strip()
+                inv_date = self._parse_invoice_date_from_title(title)
+                order_id = _invoice_order_id(href)
+                out.append(
+                    OrderInfo(
+                        order_id=order_id,
+                        invoice_url=href,
+                        invoice_date=inv_date,
+                        raw_element=row["el"],
                     )
-                if out:
-                    break
+                )
         except Exception as e:
             logger.debug("Freebox list_orders: %s", e)
         return out
@@ -426,45 +546,39 @@ class FreeboxProvider:
         date_end_str: Optional[str] = None,
     ) -> List[OrderInfo]:
         """Filtre les factures par année / mois / plage (comme Amazon)."""
-        from datetime import datetime
-
         if not any(
             [year is not None, month is not None, months, date_start_str, date_end_str]
         ):
             return orders
+        start_d: Optional[date_type] = None
+        end_d: Optional[date_type] = None
+        months_set: FrozenSet[int] = frozenset()
         if date_start_str and date_end_str:
             try:
                 start_d = datetime.strptime(date_start_str, "%Y-%m-%d").date()
                 end_d = datetime.strptime(date_end_str, "%Y-%m-%d").date()
             except ValueError:
                 return orders
-            return [
-                o
-                for o in orders
-                if o.invoice_date and start_d <= o.invoice_date <= end_d
-            ]
-        if year is not None and months:
-            return [
-                o
-                for o in orders
-                if o.invoice_date
-                and o.invoice_date.year == year
-                and o.invoice_date.month in months
-            ]
-        out: List[OrderInfo] = []
-        for o in orders:
-            if not o.invoice_date:
-                continue
-            if year is not None and o.invoice_date.year != year:
-                continue
-            if month is not None and o.invoice_date.month != month:
-                continue
-            out.append(o)
-        return out
+            # La plage prime sur année / mois
+            year = month = None
+        elif year is not None and months:
+            # Année + liste de mois : le mois seul est ignoré
+            months_set = frozenset(months)
+            month = None
+
+        def keep(d: Optional[date_type]) -> bool:
+            return (
+                d is not None
+                and (year is None or d.year == year)
+                and (month is None or d.month == month)
+                and (not months_set or d.month in months_set)
+                and (start_d is None or start_d <= d)
+                and (end_d is None or d <= end_d)
+            )
 
-    def _get_browser_session(self) -> Any:
-        import requests
+        return [o for o in orders if keep(o.invoice_date)]
 
+    def _get_browser_session(self) -> Any:
         session = requests.Session()
         for c in self.driver.get_cookies():
             session.cookies.set(c["name"], c["value"], domain=c.get("domain", ""))
@@ -473,25 +587,51 @@ class FreeboxProvider:
         )
         return session
 
+    def _refresh_http_session(self) -> None:
+        """Copie une fois les cookies du navigateur connecté dans la session HTTP."""
+        if self._http is not None:
+            self._http.close()
+        try:
+            self._http = self._get_browser_session()
+        except Exception as e:
+            logger.warning("Freebox session HTTP: %s", e)
+            self._http = None
+
     def _download_pdf(
         self, url: str, order_id: str, invoice_date: Optional[date_type] = None
     ) -> Optional[str]:
         try:
-            session = self._get_browser_session()
-            r = session.get(url, timeout=30, allow_redirects=True)
-            if r.status_code != 200:
+            session = self._http
+            if session is None:
+                logger.warning("Freebox download: pas de session HTTP (connexion ?)")
                 return None
-            ct = r.headers.get("content-type", "").lower()
-            if "pdf" not in ct and not (r.content[:4] == b"%PDF"):
-                return None
-            if invoice_date:
-                # Même logique qu'Amazon : date en préfixe (ex. freebox_2026-02-01_inv_0.pdf)
-                short_id = re.sub(r"[^\w\-]", "_", order_id)[:30]
-                name = f"freebox_{invoice_date.isoformat()}_{short_id}.pdf"
-            else:
-                name = f"freebox_{order_id}.pdf"
-            name = re.sub(r"[^\w\-.]", "_", name)[:80]
-            (self.download_path / name).write_bytes(r.content)
+            with session.get(url, timeout=30, allow_redirects=True, stream=True) as r:
+                if r.status_code != 200:
+                    return None
+                # Écriture en flux vers le disque : seul le début du PDF est inspecté
+                # (signature %PDF, le content-type des serveurs n'est pas fiable)
+                r.raw.decode_content = True
+                first = r.raw.read(4096)
+                if not first.startswith(b"%PDF"):
+                    return None
+                if invoice_date:
+                    # Même logique qu'Amazon : date en préfixe (ex. freebox_2026-02-01_inv_0.pdf)
+                    short_id = _SANITIZE_ID.sub("_", order_id)[:30]
+                    name = f"freebox_{invoice_date.isoformat()}_{short_id}.pdf"
+                else:
+                    name = f"freebox_{order_id}.pdf"
+                name = _SANITIZE_NAME.sub("_", name)[:80]
+                # Écrit sous .part puis renommé : une coupure réseau ne laisse pas
+                # de PDF tronqué sous le nom définitif
+                part = self.download_path / f"{name}.part"
+                try:
+                    with open(part, "wb") as f:
+                        f.write(first)
+                        shutil.copyfileobj(r.raw, f, length=64 * 1024)
+                    part.replace(self.download_path / name)
+                except BaseException:
+                    part.unlink(missing_ok=True)
+                    raise
             return name
         except Exception as e:
             logger.warning("Freebox download %s: %s", url[:60], e)
@@ -504,13 +644,22 @@ class FreeboxProvider:
         order_id: str = "",
         invoice_date: Optional[date_type] = None,
         force_redownload: bool = False,
+        skip_registry_check: bool = False,
     ) -> Optional[str]:
+        """
+        Télécharge une facture ; retourne le nom du fichier ou None.
+        skip_registry_check : registre déjà consulté par l'appelant (download_invoices).
+        """
         oid = order_id or (
             order_or_id.order_id
             if isinstance(order_or_id, OrderInfo)
             else str(order_or_id)
         )
-        if not force_redownload and self.registry.is_downloaded(PROVIDER_FREEBOX, oid):
+        if (
+            not force_redownload
+            and not skip_registry_check
+            and self.registry.is_downloaded(PROVIDER_FREEBOX, oid)
+        ):
             return None
         url = None
         if isinstance(order_or_id, OrderInfo) and order_or_id.invoice_url:
@@ -519,7 +668,7 @@ class FreeboxProvider:
             url = order_or_id
         if not url:
             return None
-        filename = self._download_pdf(url, oid, invoice_date)
+        filename = await asyncio.to_thread(self._download_pdf, url, oid, invoice_date)
         if filename:
             self.registry.add(
                 PROVIDER_FREEBOX,
@@ -541,13 +690,42 @@ class FreeboxProvider:
         force_redownload: bool = False,
         on_progress: Optional[Callable[[int, int, str], Any]] = None,
     ) -> Dict[str, Union[List[str], int]]:
-        ok = await self.login(otp_code=otp_code)
-        if not ok:
-            raise Exception("Échec de la connexion à l'espace Freebox")
+        # Navigateur emprunté au pool le temps de cette seule opération
+        otp_pending = False
+        try:
+            if not await self.login(otp_code=otp_code):
+                # Écran 2FA : le navigateur reste emprunté pour submit_otp et la relance
+                otp_pending = await asyncio.to_thread(self.is_2fa_required)
+                raise Exception("Échec de la connexion à l'espace Freebox")
+            return await self._download_after_login(
+                max_invoices,
+                year=year,
+                month=month,
+                months=months,
+                date_start=date_start,
+                date_end=date_end,
+                force_redownload=force_redownload,
+                on_progress=on_progress,
+            )
+        finally:
+            if not otp_pending:
+                await self._release_driver()
+
+    async def _download_after_login(
+        self,
+        max_invoices: int,
+        year: Optional[int] = None,
+        month: Optional[int] = None,
+        months: Optional[List[int]] = None,
+        date_start: Optional[str] = None,
+        date_end: Optional[str] = None,
+        force_redownload: bool = False,
+        on_progress: Optional[Callable[[int, int, str], Any]] = None,
+    ) -> Dict[str, Union[List[str], int]]:
         if not await self.navigate_to_invoices():
             raise Exception("Impossible d'accéder à la page des factures Freebox")
 
-        orders = self.list_orders_or_invoices()
+        orders = await asyncio.to_thread(self.list_orders_or_invoices)
         if not orders:
             logger.warning(
                 "Freebox: aucune facture trouvée sur la page (vérifier sélecteurs ou URL)"
@@ -581,45 +759,45 @@ class FreeboxProvider:
                 with_date,
             )
 
-        total = min(len(filtered), max_invoices)
-        files: List[str] = []
-        count = 0
-        for i, order in enumerate(filtered):
-            if count >= max_invoices:
-                break
-            if on_progress:
-                try:
-                    cb = on_progress(
-                        count, total, f"Téléchargement facture {count + 1}/{total}…"
-                    )
-                    if hasattr(cb, "__await__"):
-                        await cb  # type: ignore[misc]
-                except Exception:
-                    pass
-            fn = await self.download_invoice(
+        # Factures déjà téléchargées : écartées en une seule lecture du registre
+        if not force_redownload:
+            known = self.registry.known_ids(PROVIDER_FREEBOX)
+            pending = [o for o in filtered if o.order_id not in known]
+            if len(pending) < len(filtered):
+                logger.info(
+                    "Freebox: %s facture(s) déjà téléchargée(s), ignorée(s)",
+                    len(filtered) - len(pending),
+                )
+            filtered = pending
+
+        async def _download(i: int, order: OrderInfo) -> Optional[str]:
+            # Registre déjà consulté ci-dessus : pas de nouvelle lecture par facture
+            return await self.download_invoice(
                 order,
                 order_index=i,
                 order_id=order.order_id,
                 invoice_date=order.invoice_date,
                 force_redownload=force_redownload,
+                skip_registry_check=True,
             )
-            if fn:
-                files.append(fn)
-                count += 1
-                if on_progress:
-                    try:
-                        cb = on_progress(
-                            count, total, f"{count}/{total} facture(s) téléchargée(s)"
-                        )
-                        if hasattr(cb, "__await__"):
-                            await cb  # type: ignore[misc]
-                    except Exception:
-                        pass
-            time.sleep(1)
+
+        if filtered and self._http is None:
+            raise Exception("Freebox: session HTTP indisponible après connexion")
+        # Téléchargements en parallèle (max_workers) ; la pause d'1 s reste par worker
+        files = await download_concurrently(
+            filtered, _download, max_invoices, self.max_workers, on_progress
+        )
+        count = len(files)
         logger.info("Freebox: %s facture(s) téléchargée(s)", count)
         return {"count": count, "files": files}
 
     async def close(self) -> None:
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+        if self.pool is not None:
+            await self._release_driver()
+            return
         if self.driver and not self.keep_browser_open:
             self.driver.quit()
             self.driver = None
@@ -637,6 +815,10 @@ class FreeboxProvider:
             return False
 
     async def submit_otp(self, otp_code: str) -> bool:
+        # Selenium est bloquant : exécuté dans un thread pour libérer la boucle asyncio
+        return await asyncio.to_thread(self._submit_otp_sync, otp_code)
+
+    def _submit_otp_sync(self, otp_code: str) -> bool:
         if not self.driver:
             return False
         try:
@@ -646,11 +828,15 @@ class FreeboxProvider:
             )
             inp.clear()
             inp.send_keys(otp_code)
-            self.driver.find_element(
+            submit = self.driver.find_element(
                 By.CSS_SELECTOR, "input[type='submit'], button[type='submit']"
-            ).click()
-            time.sleep(4)
-            return self._is_logged_in()
+            )
+            submit.click()
+            self._wait_for(EC.staleness_of(submit), timeout=10)
+            if not self._is_logged_in():
+                return False
+            self._refresh_http_session()
+            return True
         except Exception as e:
             logger.warning("Freebox submit_otp: %s", e)
             return False
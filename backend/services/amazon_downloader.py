@@ -23,6 +23,7 @@ from selenium.webdriver.support.ui import Select, WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.firefox import GeckoDriverManager
 
+from backend.providers.base import OTPRequiredError
 from backend.services.invoice_registry import PROVIDER_AMAZON, InvoiceRegistry
 
 logger = logging.getLogger(__name__)
@@ -1745,7 +1746,9 @@ class AmazonInvoiceDownloader:
             login_result = await self.login(otp_code=otp_code)
             if not login_result:
                 if self._is_2fa_required():
-                    raise Exception("Code 2FA requis - veuillez fournir le code OTP")
+                    raise OTPRequiredError(
+                        "Code 2FA requis - veuillez fournir le code OTP"
+                    )
                 # Connexion auto échouée (challenge, CAPTCHA…) : attendre connexion manuelle
                 if self.driver:
                     logger.info(
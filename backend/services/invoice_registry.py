@@ -5,9 +5,9 @@ Permet de ne télécharger que les factures non encore présentes.
 
 import json
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 logger = logging.getLogger(__name__)
 
@@ -93,6 +93,61 @@ class InvoiceRegistry:
                 return True
         return False
 
+    def known_ids(
+        self,
+        provider: str,
+        check_file_exists: bool = True,
+        max_age_days: Optional[int] = None,
+    ) -> Set[str]:
+        """
+        order_id des factures enregistrées pour un provider, en une seule lecture du
+        registre (au lieu d'un is_downloaded() par facture).
+        Avec max_age_days, les entrées plus anciennes sont ignorées (à re-télécharger).
+        """
+        self._load()
+        cutoff = (
+            datetime.utcnow() - timedelta(days=max_age_days)
+            if max_age_days is not None
+            else None
+        )
+        ids: Set[str] = set()
+        for entry in self._entries(provider):
+            order_id = entry.get("order_id")
+            if not order_id:
+                continue
+            if check_file_exists:
+                path = self.download_path / entry.get("file_path", "")
+                if not path.exists():
+                    continue
+            if cutoff is not None:
+                try:
+                    downloaded_at = datetime.fromisoformat(
+                        str(entry.get("downloaded_at", "")).rstrip("Z")
+                    )
+                except ValueError:
+                    continue
+                if downloaded_at < cutoff:
+                    continue
+            ids.add(order_id)
+        return ids
+
+    def get_entry(
+        self,
+        provider: str,
+        order_id: str,
+        check_file_exists: bool = True,
+    ) -> Optional[Dict[str, Any]]:
+        """Entrée enregistrée pour (provider, order_id), ou None (fichier absent si vérifié)."""
+        self._load()
+        for entry in self._entries(provider):
+            if entry.get("order_id") == order_id:
+                if check_file_exists:
+                    path = self.download_path / entry.get("file_path", "")
+                    if not path.exists():
+                        return None
+                return dict(entry)
+        return None
+
     def add(
         self,
         provider: str,
@@ -100,10 +155,18 @@ class InvoiceRegistry:
         file_path: str,
         invoice_date: Optional[str] = None,
         invoice_url: Optional[str] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
     ) -> None:
-        """Enregistre une facture téléchargée (invoice_url optionnel pour dédoublonnage par URL)."""
+        """
+        Enregistre une facture téléchargée (invoice_url optionnel pour dédoublonnage par URL).
+        etag / last_modified : en-têtes HTTP de la réponse, pour un GET conditionnel ultérieur.
+        """
         self._load()
         entries = self._entries(provider)
+        validators = {
+            k: v for k, v in (("etag", etag), ("last_modified", last_modified)) if v
+        }
         for e in entries:
             if e.get("order_id") == order_id:
                 e["file_path"] = file_path
@@ -111,6 +174,7 @@ class InvoiceRegistry:
                 e["downloaded_at"] = datetime.utcnow().isoformat() + "Z"
                 if invoice_url is not None:
                     e["invoice_url"] = invoice_url
+                e.update(validators)
                 self._save()
                 return
             if invoice_url and self._normalize_invoice_url(
@@ -121,6 +185,7 @@ class InvoiceRegistry:
                 e["invoice_date"] = invoice_date
                 e["downloaded_at"] = datetime.utcnow().isoformat() + "Z"
                 e["invoice_url"] = invoice_url
+                e.update(validators)
                 self._save()
                 return
         entries.append(
@@ -130,6 +195,7 @@ class InvoiceRegistry:
                 "invoice_date": invoice_date,
                 "downloaded_at": datetime.utcnow().isoformat() + "Z",
                 **({"invoice_url": invoice_url} if invoice_url is not None else {}),
+                **validators,
             }
         )
         self._save()
@@ -61,7 +61,7 @@ mkdir -p logs
 # Démarrer le backend en arrière-plan
 echo "→ Démarrage du backend FastAPI (port 8000)..."
 export PYTHONPATH="."
-nohup python3 -m uvicorn backend.main:app --host 0.0.0.0 --port 8000 --reload > logs/backend.log 2>&1 &
+nohup python3 -m uvicorn backend.main:app --host 0.0.0.0 --port 8000 --loop uvloop --reload > logs/backend.log 2>&1 &
 BACKEND_PID=$!
 echo $BACKEND_PID > logs/backend.pid
 
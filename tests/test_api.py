@@ -2,6 +2,10 @@
 Tests pour l'API FastAPI (V2 multi-fournisseurs).
 """
 
+import logging
+import time
+from pathlib import Path
+from typing import Any
 from unittest.mock import patch
 
 import pytest
@@ -80,3 +84,220 @@ def test_submit_otp_returns_503_when_downloader_unavailable(client: TestClient)
     with patch("backend.main._get_downloader", return_value=None):
         response = client.post("/api/submit-otp", json={"otp_code": "123456"})
     assert response.status_code == 503
+
+
+def test_log_endpoint(client: TestClient) -> None:
+    """L'endpoint /api/log retourne la fin du fichier de log en texte brut."""
+    response = client.get("/api/log")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+
+def test_tail_log_reads_only_last_bytes(tmp_path: Path) -> None:
+    """_tail_log ne lit que les derniers octets du fichier."""
+    from backend.main import _tail_log
+
+    log_file = tmp_path / "app.log"
+    log_file.write_bytes(b"a" * 100 + b"fin")
+    assert _tail_log(log_file, max_bytes=3) == b"fin"
+    assert _tail_log(log_file, max_bytes=1000) == b"a" * 100 + b"fin"
+
+
+def test_log_line_formatted_once() -> None:
+    """Le QueueHandler ne préfixe pas le message : une ligne = un seul en-tête."""
+    from backend.main import _log_formatter, _queue_handler
+
+    record = logging.LogRecord(
+        "backend.main", logging.INFO, __file__, 1, "bonjour %s", ("monde",), None
+    )
+    line = _log_formatter.format(_queue_handler.prepare(record))
+    assert line.endswith(" - backend.main - INFO - bonjour monde")
+    assert line.count("INFO") == 1
+
+
+def _log_record(msg: str, level: int = logging.INFO) -> logging.LogRecord:
+    """Enregistrement de log minimal pour tester les handlers."""
+    return logging.LogRecord("test", level, __file__, 1, msg, None, None)
+
+
+def test_buffered_log_handler_flushes(tmp_path: Path) -> None:
+    """INFO reste en tampon, WARNING est écrit aussitôt, le thread vide le reste."""
+    from backend.main import BufferedRotatingFileHandler
+
+    log_file = tmp_path / "app.log"
+    handler = BufferedRotatingFileHandler(log_file, flush_interval=60)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    try:
+        handler.emit(_log_record("info"))
+        assert log_file.read_text() == ""
+        handler.emit(_log_record("alerte", logging.WARNING))
+        assert log_file.read_text() == "info\nalerte\n"
+    finally:
+        handler.close()
+
+    periodic_file = tmp_path / "periodic.log"
+    handler = BufferedRotatingFileHandler(periodic_file, flush_interval=0.01)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    try:
+        handler.emit(_log_record("info"))
+        deadline = time.monotonic() + 2
+        while periodic_file.read_text() == "" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert periodic_file.read_text() == "info\n"
+    finally:
+        handler.close()
+
+
+def test_buffered_log_handler_rolls_over_on_bytes(tmp_path: Path) -> None:
+    """maxBytes est comparé à la taille encodée (accents UTF-8 sur 2 octets)."""
+    from backend.main import BufferedRotatingFileHandler
+
+    log_file = tmp_path / "app.log"
+    handler = BufferedRotatingFileHandler(
+        log_file, maxBytes=100, backupCount=1, encoding="utf-8", flush_interval=60
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    line = "é" * 30  # 30 caractères, 61 octets avec le saut de ligne
+    try:
+        handler.emit(_log_record(line))
+        assert handler._size == 61
+        handler.emit(_log_record(line))
+        handler.flush()
+    finally:
+        handler.close()
+    assert (tmp_path / "app.log.1").read_text(encoding="utf-8") == line + "\n"
+    assert log_file.read_text(encoding="utf-8") == line + "\n"
+
+
+def test_buffered_log_handler_formats_once(tmp_path: Path) -> None:
+    """Chaque enregistrement n'est mis en forme qu'une fois, rotation comprise."""
+    from backend.main import BufferedRotatingFileHandler
+
+    class CountingFormatter(logging.Formatter):
+        calls = 0
+
+        def format(self, record: logging.LogRecord) -> str:
+            CountingFormatter.calls += 1
+            return super().format(record)
+
+    handler = BufferedRotatingFileHandler(
+        tmp_path / "app.log", maxBytes=10, backupCount=1, flush_interval=60
+    )
+    handler.setFormatter(CountingFormatter("%(message)s"))
+    try:
+        for i in range(3):
+            handler.emit(_log_record(f"ligne {i}"))
+    finally:
+        handler.close()
+    assert CountingFormatter.calls == 3
+
+
+def test_lifespan_restart_keeps_log_listener() -> None:
+    """Plusieurs cycles démarrage / arrêt ne coupent pas le thread de logs."""
+    from backend.main import _log_listener
+
+    for _ in range(2):
+        with TestClient(app):
+            pass
+    assert _log_listener._thread is not None
+    assert _log_listener._thread.is_alive()
+
+
+def test_invoice_file_endpoint(client: TestClient, tmp_path: Path) -> None:
+    """Une facture est servie directement, ou déléguée à nginx avec USE_X_ACCEL."""
+    from backend.main import settings
+
+    (tmp_path / "freebox").mkdir()
+    (tmp_path / "freebox" / "facture.pdf").write_bytes(b"%PDF-1.4")
+    with patch.object(settings, "download_path", str(tmp_path)):
+        response = client.get("/api/invoices/freebox/facture.pdf")
+        assert response.status_code == 200
+        assert response.content == b"%PDF-1.4"
+
+        assert client.get("/api/invoices/freebox/absente.pdf").status_code == 404
+        assert client.get("/api/invoices/inconnu/facture.pdf").status_code == 404
+
+        with patch.object(settings, "use_x_accel", True):
+            response = client.get("/api/invoices/freebox/facture.pdf")
+        assert response.status_code == 200
+        assert response.headers["x-accel-redirect"] == "/internal/freebox/facture.pdf"
+        assert response.content == b""
+
+
+def test_download_stream_reports_otp_required(client: TestClient) -> None:
+    """Un OTPRequiredError du provider produit un événement error avec requires_otp."""
+    from unittest.mock import AsyncMock, MagicMock
+
+    from backend.providers.base import OTPRequiredError
+
+    downloader = MagicMock()
+    downloader.download_invoices = AsyncMock(side_effect=OTPRequiredError("Code 2FA"))
+    downloader.is_2fa_required.return_value = False
+    with patch("backend.main.downloaders", {"amazon": downloader}):
+        response = client.post("/api/download", json={"max_invoices": 1})
+    assert response.status_code == 200
+    assert "event: error" in response.text
+    assert '"requires_otp":true' in response.text.replace(" ", "")
+
+
+def test_gzip_skips_sse_stream(client: TestClient) -> None:
+    """Le flux SSE /api/download n'est jamais compressé (événements non retardés)."""
+    from unittest.mock import AsyncMock, MagicMock
+
+    downloader = MagicMock()
+    downloader.download_invoices = AsyncMock(
+        return_value={"count": 200, "files": [f"facture_{i}.pdf" for i in range(200)]}
+    )
+    with patch("backend.main.downloaders", {"amazon": downloader}):
+        response = client.post(
+            "/api/download",
+            json={"max_invoices": 200},
+            headers={"Accept-Encoding": "gzip"},
+        )
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert "event: done" in response.text
+
+
+def test_gzip_skips_invoice_files(client: TestClient, tmp_path: Path) -> None:
+    """Les factures PDF (déjà compressées) sont servies sans gzip."""
+    from backend.main import settings
+
+    (tmp_path / "freebox").mkdir()
+    (tmp_path / "freebox" / "facture.pdf").write_bytes(b"%PDF-1.4 " + b"a" * 4096)
+    with patch.object(settings, "download_path", str(tmp_path)):
+        response = client.get(
+            "/api/invoices/freebox/facture.pdf", headers={"Accept-Encoding": "gzip"}
+        )
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.content.startswith(b"%PDF-1.4")
+
+
+def test_download_stream_closes_progress_channel(client: TestClient) -> None:
+    """Fin du flux SSE : canal fermé, une progression tardive est ignorée."""
+    import asyncio
+    import inspect
+    from unittest.mock import MagicMock
+
+    import anyio
+
+    captured: dict = {}
+
+    async def fake_download(on_progress: Any, **kwargs: Any) -> dict:
+        captured["on_progress"] = on_progress
+        await on_progress(1, 1, "Téléchargement facture 1/1…")
+        return {"count": 1, "files": ["facture.pdf"]}
+
+    downloader = MagicMock()
+    downloader.download_invoices = fake_download
+    with patch("backend.main.downloaders", {"amazon": downloader}):
+        response = client.post("/api/download", json={"max_invoices": 1})
+    assert "event: progress" in response.text
+    assert "event: done" in response.text
+    send_stream = inspect.getclosurevars(captured["on_progress"]).nonlocals[
+        "send_stream"
+    ]
+    with pytest.raises(anyio.ClosedResourceError):
+        send_stream.send_nowait(("progress", 2, 2, ""))
+    asyncio.run(captured["on_progress"](2, 2, "après déconnexion"))
@@ -0,0 +1,80 @@
+"""
+Tests du pool de navigateurs Selenium partagé.
+"""
+
+from typing import Any
+
+import pytest
+
+from backend.providers.browser_pool import BrowserPool
+
+
+class FakeDriver:
+    """Driver minimal : current_url échoue une fois le navigateur fermé."""
+
+    def __init__(self, name: str, alive: bool = True) -> None:
+        self.name = name
+        self.alive = alive
+        self.quit_calls = 0
+
+    @property
+    def current_url(self) -> str:
+        if not self.alive:
+            raise RuntimeError("navigateur fermé")
+        return "about:blank"
+
+    def quit(self) -> None:
+        self.quit_calls += 1
+        self.alive = False
+
+
+@pytest.mark.asyncio
+async def test_acquire_reuses_last_released_driver() -> None:
+    pool = BrowserPool(max_idle=2)
+    first, second = FakeDriver("a"), FakeDriver("b")
+    await pool.release(first)
+    await pool.release(second)
+
+    def factory() -> Any:
+        raise AssertionError("aucun driver ne doit être créé")
+
+    assert await pool.acquire(factory) is second
+    assert await pool.acquire(factory) is first
+
+
+@pytest.mark.asyncio
+async def test_acquire_replaces_dead_driver() -> None:
+    pool = BrowserPool()
+    dead = FakeDriver("mort", alive=False)
+    await pool.release(dead)
+    fresh = FakeDriver("neuf")
+
+    assert await pool.acquire(lambda: fresh) is fresh
+    assert dead.quit_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_release_quits_driver_beyond_max_idle() -> None:
+    pool = BrowserPool(max_idle=1)
+    kept, extra = FakeDriver("gardé"), FakeDriver("en trop")
+    await pool.release(kept)
+    await pool.release(extra)
+
+    assert extra.quit_calls == 1
+    assert kept.quit_calls == 0
+    assert await pool.acquire(lambda: FakeDriver("neuf")) is kept
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("keep_browser_open, expected_quits", [(False, 1), (True, 0)])
+async def test_close_respects_keep_browser_open(
+    keep_browser_open: bool, expected_quits: int
+) -> None:
+    pool = BrowserPool(keep_browser_open=keep_browser_open)
+    driver = FakeDriver("a")
+    await pool.release(driver)
+    await pool.close()
+
+    assert driver.quit_calls == expected_quits
+    fresh = FakeDriver("neuf")
+    assert await pool.acquire(lambda: fresh) is fresh
@@ -0,0 +1,72 @@
+"""
+Tests du cache des chemins de drivers Selenium.
+"""
+
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from backend.providers import driver_paths
+
+
+@pytest.fixture
+def cache_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "driver_cache.json"
+    monkeypatch.setattr(driver_paths, "DRIVER_CACHE_FILE", path)
+    driver_paths.resolve_driver_path.cache_clear()
+    return path
+
+
+def test_resolve_driver_path_uses_fresh_disk_cache(
+    cache_file: Path, tmp_path: Path
+) -> None:
+    driver = tmp_path / "chromedriver"
+    driver.write_text("")
+    cache_file.write_text(
+        json.dumps({"chrome": {"path": str(driver), "mtime": time.time()}})
+    )
+    assert driver_paths.resolve_driver_path("chrome") == str(driver)
+
+
+def test_disk_cache_ignores_expired_or_missing_driver(
+    cache_file: Path, tmp_path: Path
+) -> None:
+    driver = tmp_path / "geckodriver"
+    driver.write_text("")
+    expired = time.time() - driver_paths.DRIVER_CACHE_TTL_SECONDS - 1
+    cache_file.write_text(
+        json.dumps(
+            {
+                "firefox": {"path": str(driver), "mtime": expired},
+                "chrome": {"path": str(tmp_path / "absent"), "mtime": time.time()},
+            }
+        )
+    )
+    assert driver_paths._read_disk_cache("firefox") is None
+    assert driver_paths._read_disk_cache("chrome") is None
+
+
+def test_write_disk_cache_keeps_other_browsers(cache_file: Path) -> None:
+    driver_paths._write_disk_cache("chrome", "/opt/chromedriver")
+    driver_paths._write_disk_cache("firefox", "/opt/geckodriver")
+    data = json.loads(cache_file.read_text())
+    assert data["chrome"]["path"] == "/opt/chromedriver"
+    assert data["firefox"]["path"] == "/opt/geckodriver"
+
+
+def test_invalidate_driver_path_forgets_memory_and_disk(
+    cache_file: Path, tmp_path: Path
+) -> None:
+    driver = tmp_path / "chromedriver"
+    driver.write_text("")
+    driver_paths._write_disk_cache("chrome", str(driver))
+    driver_paths._write_disk_cache("firefox", "/opt/geckodriver")
+    assert driver_paths.resolve_driver_path("chrome") == str(driver)
+
+    driver_paths.invalidate_driver_path("chrome")
+    assert driver_paths.resolve_driver_path.cache_info().currsize == 0
+    data = json.loads(cache_file.read_text())
+    assert "chrome" not in data
+    assert data["firefox"]["path"] == "/opt/geckodriver"
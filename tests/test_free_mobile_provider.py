@@ -0,0 +1,280 @@
+"""
+Tests du provider Free Mobile (Espace abonné mobile).
+"""
+
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from backend.providers.free_mobile import (
+    PROVIDER_FREE_MOBILE,
+    FreeMobileProvider,
+    _invoice_order_id,
+)
+
+
+def test_free_mobile_provider_id() -> None:
+    assert FreeMobileProvider.PROVIDER_ID == PROVIDER_FREE_MOBILE
+    assert FreeMobileProvider.PROVIDER_ID == "free_mobile"
+
+
+def test_free_mobile_list_orders_no_driver() -> None:
+    p = FreeMobileProvider(login="a", password="b", download_path="./test_free_mobile")
+    assert p.list_orders_or_invoices() == []
+
+
+def test_free_mobile_parse_date_from_title() -> None:
+    p = FreeMobileProvider(login="a", password="b", download_path="./test_free_mobile")
+    assert p._parse_invoice_date_from_title("Facture Février 2026") == date(2026, 2, 1)
+    assert p._parse_invoice_date_from_title("facture aout 2025") == date(2025, 8, 1)
+    assert p._parse_invoice_date_from_title("Facture 2025-11") == date(2025, 11, 1)
+    assert p._parse_invoice_date_from_title("Facture du 15/03/2024") == date(2024, 3, 1)
+    assert p._parse_invoice_date_from_title("Télécharger la facture") is None
+
+
+def test_free_mobile_parse_date_from_url() -> None:
+    p = FreeMobileProvider(login="a", password="b", download_path="./test_free_mobile")
+    assert p._parse_invoice_date_from_url(
+        "https://mobile.free.fr/account/facture_2026_02.pdf"
+    ) == date(2026, 2, 1)
+    assert p._parse_invoice_date_from_url(
+        "https://mobile.free.fr/account/v2/factures?year=2025&month=7"
+    ) == date(2025, 7, 1)
+    assert p._parse_invoice_date_from_url("https://mobile.free.fr/account/") is None
+
+
+def test_free_mobile_invoice_order_id_is_stable() -> None:
+    url = "https://mobile.free.fr/account/v2/factures/2026-02.pdf"
+    assert _invoice_order_id(url) == _invoice_order_id(url)
+    assert _invoice_order_id(url).startswith("free_mobile_inv_")
+    assert len(_invoice_order_id(url)) == len("free_mobile_inv_") + 12
+    assert _invoice_order_id(url) != _invoice_order_id(url.replace("02", "03"))
+
+
+@pytest.mark.asyncio
+async def test_free_mobile_close_no_driver() -> None:
+    p = FreeMobileProvider(login="a", password="b", download_path="./test_free_mobile")
+    await p.close()
+    assert p.driver is None
+
+
+def test_widen_command_pool() -> None:
+    from urllib3 import PoolManager
+
+    from backend.providers.free_mobile import _widen_command_pool
+
+    class Executor:
+        _conn = PoolManager(num_pools=1)
+
+    class Driver:
+        command_executor = Executor()
+
+    driver = Driver()
+    assert _widen_command_pool(driver, maxsize=20) is driver
+    assert Executor._conn.connection_pool_kw["maxsize"] == 20
+    assert _widen_command_pool(object()) is not None
+
+
+class _FakeRaw:
+    """Flux brut simulé : renvoie les morceaux dans l'ordre, lève une exception."""
+
+    def __init__(self, chunks: list) -> None:
+        self.chunks = chunks
+        self.decode_content = False
+
+    def read(self, size: int = -1) -> bytes:
+        if not self.chunks:
+            return b""
+        chunk = self.chunks.pop(0)
+        if isinstance(chunk, Exception):
+            raise chunk
+        return chunk
+
+
+class _FakeResponse:
+    def __init__(self, chunks: list, status_code: int = 200) -> None:
+        self.status_code = status_code
+        self.headers = {"ETag": '"v1"'}
+        self.raw = _FakeRaw(chunks)
+
+    def __enter__(self) -> "_FakeResponse":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        pass
+
+
+class _FakeSession:
+    def __init__(self, chunks: list, status_code: int = 200) -> None:
+        self.chunks = chunks
+        self.status_code = status_code
+        self.sent_headers: list = []
+
+    def get(self, url: str, **kwargs: Any) -> _FakeResponse:
+        self.sent_headers.append(kwargs.get("headers") or {})
+        return _FakeResponse(list(self.chunks), self.status_code)
+
+
+def test_free_mobile_download_pdf_leaves_no_truncated_file(tmp_path: Path) -> None:
+    p = FreeMobileProvider(login="a", password="b", download_path=tmp_path)
+
+    p._http = _FakeSession([b"%PDF-1.4 ", b"contenu"])
+    name, validators = p._download_pdf("https://x/f.pdf", "f1", date(2026, 2, 1))
+    assert name == "free_mobile_2026-02-01_f1.pdf"
+    assert (tmp_path / name).read_bytes() == b"%PDF-1.4 contenu"
+    assert validators["etag"] == '"v1"'
+
+    p._http = _FakeSession([b"%PDF-1.4 ", ConnectionError("coupure")])
+    assert p._download_pdf("https://x/g.pdf", "g1", date(2026, 3, 1)) == (None, {})
+    assert sorted(f.name for f in tmp_path.iterdir()) == [name]
+
+
+@pytest.mark.asyncio
+async def test_free_mobile_forced_download_skips_conditional_get(
+    tmp_path: Path,
+) -> None:
+    from backend.providers.base import OrderInfo
+
+    p = FreeMobileProvider(login="a", password="b", download_path=tmp_path)
+    (tmp_path / "ancienne.pdf").write_bytes(b"%PDF-1.4 ancienne")
+    p.registry.add(PROVIDER_FREE_MOBILE, "f1", "ancienne.pdf", etag='"v0"')
+    session = _FakeSession([b"%PDF-1.4 ", b"neuve"])
+    p._http = session
+    order = OrderInfo(order_id="f1", invoice_url="https://x/f.pdf")
+
+    # Re-téléchargement forcé : GET complet, sans If-None-Match
+    name = await p.download_invoice(order, order_id="f1", force_redownload=True)
+    assert session.sent_headers[-1] == {}
+    assert name is not None
+    assert (tmp_path / name).read_bytes() == b"%PDF-1.4 neuve"
+
+    # Entrée expirée : revalidation avec l'ETag enregistré
+    await p.download_invoice(order, order_id="f1", skip_registry_check=True)
+    assert session.sent_headers[-1] == {"If-None-Match": '"v1"'}
+
+
+def test_free_mobile_setup_driver_retries_with_fresh_driver_path(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from selenium.common.exceptions import SessionNotCreatedException
+
+    from backend.providers import free_mobile
+
+    p = FreeMobileProvider(login="a", password="b", download_path=tmp_path)
+    invalidated: list = []
+    attempts: list = []
+
+    def setup_chrome() -> str:
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise SessionNotCreatedException("ChromeDriver only supports Chrome 120")
+        return "driver"
+
+    monkeypatch.setattr(free_mobile, "invalidate_driver_path", invalidated.append)
+    monkeypatch.setattr(p, "_setup_chrome", setup_chrome)
+    assert p._setup_driver() == "driver"
+    assert invalidated == ["chrome"]
+    assert len(attempts) == 2
+
+
+@pytest.mark.asyncio
+async def test_free_mobile_pooled_driver_kept_only_for_pending_otp(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from unittest.mock import MagicMock
+
+    from selenium.common.exceptions import NoSuchElementException
+
+    from backend.providers.browser_pool import BrowserPool
+
+    pool = BrowserPool()
+    driver = MagicMock()
+    p = FreeMobileProvider(login="a", password="b", download_path=tmp_path, pool=pool)
+    logged_in = [True]
+
+    async def ok() -> bool:
+        return True
+
+    monkeypatch.setattr(p, "_open_driver", lambda: driver)
+    monkeypatch.setattr(p, "_login_sync", lambda otp_code=None: logged_in[0])
+    monkeypatch.setattr(p, "navigate_to_invoices", ok)
+    monkeypatch.setattr(p, "list_orders_or_invoices_from_all_lines", lambda: [])
+    monkeypatch.setattr(p, "list_orders_or_invoices", lambda: [])
+    monkeypatch.setattr(p, "_save_debug_page", lambda prefix="": None)
+    monkeypatch.setattr(p, "_wait_for", lambda *args, **kwargs: True)
+    monkeypatch.setattr(p, "_is_logged_in", lambda: True)
+
+    # Téléchargement terminé : navigateur rendu au pool
+    await p.download_invoices()
+    assert p.driver is None and pool._idle.qsize() == 1
+
+    # Écran 2FA : navigateur gardé pour submit_otp
+    logged_in[0] = False
+    with pytest.raises(Exception, match="connexion"):
+        await p.download_invoices()
+    assert p.driver is driver and pool._idle.qsize() == 0
+    assert p.is_2fa_required()
+    assert await p.submit_otp("123456")
+
+    # Relance après le code : rendu à la fin
+    logged_in[0] = True
+    await p.download_invoices()
+    assert p.driver is None and pool._idle.qsize() == 1
+
+    # Échec de connexion sans 2FA : rendu aussi
+    driver.find_element.side_effect = NoSuchElementException()
+    logged_in[0] = False
+    with pytest.raises(Exception, match="connexion"):
+        await p.download_invoices()
+    assert p.driver is None and pool._idle.qsize() == 1
+
+
+def test_free_mobile_download_pdf_without_session_never_uses_driver(
+    tmp_path: Path,
+) -> None:
+    from unittest.mock import MagicMock
+
+    p = FreeMobileProvider(login="a", password="b", download_path=tmp_path)
+    p.driver = MagicMock()
+    assert p._download_pdf("https://x/f.pdf", "f1") == (None, {})
+    p.driver.get_cookies.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_free_mobile_unchanged_invoice_not_counted(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from backend.providers.base import OrderInfo
+
+    p = FreeMobileProvider(
+        login="a", password="b", download_path=tmp_path, max_age_days=0
+    )
+    (tmp_path / "ancienne.pdf").write_bytes(b"%PDF-1.4 ancienne")
+    p.registry.add(PROVIDER_FREE_MOBILE, "f1", "ancienne.pdf", etag='"v0"')
+    session = _FakeSession([], status_code=304)
+    p._http = session
+    debug_pages: list = []
+
+    async def ok(otp_code: Any = None) -> bool:
+        return True
+
+    monkeypatch.setattr(p, "login", ok)
+    monkeypatch.setattr(
+        p,
+        "list_orders_or_invoices_from_all_lines",
+        lambda: [OrderInfo(order_id="f1", invoice_url="https://x/f.pdf")],
+    )
+    monkeypatch.setattr(p, "_save_debug_page", debug_pages.append)
+    progress: list = []
+    result = await p.download_invoices(on_progress=lambda c, t, m: progress.append(c))
+
+    # Entrée expirée revalidée : 304, ni comptée ni annoncée comme téléchargée
+    assert session.sent_headers == [{"If-None-Match": '"v0"'}]
+    assert result == {"count": 0, "files": [], "unchanged": 1}
+    assert max(progress) == 0
+    assert debug_pages == []
+    entry = p.registry.get_entry(PROVIDER_FREE_MOBILE, "f1")
+    assert entry is not None and entry["file_path"] == "ancienne.pdf"
+    assert "f1" in p.registry.known_ids(PROVIDER_FREE_MOBILE, max_age_days=1)
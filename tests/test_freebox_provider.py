@@ -2,9 +2,19 @@
 Tests du provider Freebox (Espace abonné).
 """
 
+import asyncio
+from datetime import date
+from pathlib import Path
+from typing import Any, List
+
 import pytest
 
-from backend.providers.freebox import PROVIDER_FREEBOX, FreeboxProvider
+from backend.providers.base import OrderInfo
+from backend.providers.freebox import (
+    PROVIDER_FREEBOX,
+    FreeboxProvider,
+    _invoice_order_id,
+)
 
 
 def test_freebox_provider_id() -> None:
@@ -28,8 +38,185 @@ def test_freebox_list_orders_no_driver() -> None:
     assert p.list_orders_or_invoices() == []
 
 
+def test_freebox_parse_date_from_title() -> None:
+    p = FreeboxProvider(login="a", password="b", download_path="./test_freebox")
+    assert p._parse_invoice_date_from_title(
+        "Télécharger votre facture de Février 2026"
+    ) == date(2026, 2, 1)
+    assert p._parse_invoice_date_from_title("facture aout 2025") == date(2025, 8, 1)
+    assert p._parse_invoice_date_from_title("Facture 2024-11") == date(2024, 11, 1)
+    assert p._parse_invoice_date_from_title("Télécharger") is None
+
+
+def test_freebox_invoice_order_id_is_stable() -> None:
+    url = "https://adsl.free.fr/facture.pdf.pl?id=123&no_facture=456"
+    assert _invoice_order_id(url) == _invoice_order_id(url)
+    assert _invoice_order_id(url).startswith("freebox_inv_")
+    assert len(_invoice_order_id(url)) == len("freebox_inv_") + 12
+    assert _invoice_order_id(url) != _invoice_order_id(url.replace("456", "457"))
+
+
+def test_freebox_last_invoice_path_roundtrip(tmp_path: Any) -> None:
+    p = FreeboxProvider(login="a", password="b", download_path=tmp_path)
+    assert p._load_last_invoice_path() is None
+    p._save_last_invoice_path("/home.pl")
+    assert p._load_last_invoice_path() == "/home.pl"
+
+
 @pytest.mark.asyncio
 async def test_freebox_close_no_driver() -> None:
     p = FreeboxProvider(login="a", password="b", download_path="./test_freebox")
     await p.close()
     assert p.driver is None
+
+
+@pytest.mark.asyncio
+async def test_freebox_download_invoices_parallel(tmp_path: Any) -> None:
+    p = FreeboxProvider(login="a", password="b", download_path=tmp_path, max_workers=3)
+    orders = [OrderInfo(order_id=f"inv_{i}", invoice_url=f"u{i}") for i in range(5)]
+    running: List[int] = [0, 0]
+
+    async def ok(*args: Any, **kwargs: Any) -> bool:
+        return True
+
+    async def fake_download(order: OrderInfo, **kwargs: Any) -> str:
+        running[0] += 1
+        running[1] = max(running[1], running[0])
+        await asyncio.sleep(0.01)
+        running[0] -= 1
+        return f"{order.order_id}.pdf"
+
+    p.login = ok  # type: ignore[method-assign]
+    p._http = object()  # session créée par login en temps normal
+    p.navigate_to_invoices = ok  # type: ignore[method-assign]
+    p.list_orders_or_invoices = lambda: orders  # type: ignore[method-assign]
+    p.download_invoice = fake_download  # type: ignore[method-assign]
+    progress: List[int] = []
+    result = await p.download_invoices(
+        max_invoices=3, on_progress=lambda c, t, m: progress.append(c)
+    )
+    assert result["count"] == 3
+    assert len(result["files"]) == 3
+    assert running[1] == 3
+    assert max(progress) == 3
+
+
+@pytest.mark.asyncio
+async def test_freebox_download_invoices_skips_registered(tmp_path: Any) -> None:
+    p = FreeboxProvider(login="a", password="b", download_path=tmp_path)
+    (tmp_path / "inv_0.pdf").write_bytes(b"%PDF")
+    p.registry.add(PROVIDER_FREEBOX, "inv_0", "inv_0.pdf")
+    orders = [OrderInfo(order_id=f"inv_{i}", invoice_url=f"u{i}") for i in range(2)]
+    requested: List[str] = []
+
+    async def ok(*args: Any, **kwargs: Any) -> bool:
+        return True
+
+    async def fake_download(order: OrderInfo, **kwargs: Any) -> str:
+        requested.append(order.order_id)
+        return f"{order.order_id}.pdf"
+
+    p.login = ok  # type: ignore[method-assign]
+    p._http = object()  # session créée par login en temps normal
+    p.navigate_to_invoices = ok  # type: ignore[method-assign]
+    p.list_orders_or_invoices = lambda: orders  # type: ignore[method-assign]
+    p.download_invoice = fake_download  # type: ignore[method-assign]
+    result = await p.download_invoices()
+    assert requested == ["inv_1"]
+    assert result["files"] == ["inv_1.pdf"]
+
+
+def test_freebox_download_pdf_leaves_no_truncated_file(tmp_path: Any) -> None:
+    from unittest.mock import MagicMock
+
+    def session_for(*chunks: Any) -> MagicMock:
+        response = MagicMock(status_code=200)
+        response.__enter__.return_value = response
+        response.raw.read.side_effect = list(chunks)
+        session = MagicMock()
+        session.get.return_value = response
+        return session
+
+    p = FreeboxProvider(login="a", password="b", download_path=tmp_path)
+    p._http = session_for(b"%PDF-1.4 ", b"contenu", b"")
+    name = p._download_pdf("https://x/f.pdf", "f1", date(2026, 2, 1))
+    assert name == "freebox_2026-02-01_f1.pdf"
+    assert (tmp_path / name).read_bytes() == b"%PDF-1.4 contenu"
+
+    p._http = session_for(b"%PDF-1.4 ", ConnectionError("coupure"))
+    assert p._download_pdf("https://x/g.pdf", "g1", date(2026, 3, 1)) is None
+    assert sorted(f.name for f in tmp_path.iterdir()) == [name]
+
+
+def test_freebox_setup_driver_retries_with_fresh_driver_path(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from selenium.common.exceptions import SessionNotCreatedException
+
+    from backend.providers import freebox
+
+    p = FreeboxProvider(login="a", password="b", download_path=tmp_path)
+    invalidated: list = []
+    attempts: list = []
+
+    def setup_chrome() -> str:
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise SessionNotCreatedException("ChromeDriver only supports Chrome 120")
+        return "driver"
+
+    monkeypatch.setattr(freebox, "invalidate_driver_path", invalidated.append)
+    monkeypatch.setattr(p, "_setup_chrome", setup_chrome)
+    assert p._setup_driver() == "driver"
+    assert invalidated == ["chrome"]
+    assert len(attempts) == 2
+
+
+@pytest.mark.asyncio
+async def test_freebox_pooled_driver_kept_only_for_pending_otp(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from unittest.mock import MagicMock
+
+    from selenium.common.exceptions import NoSuchElementException
+
+    from backend.providers.browser_pool import BrowserPool
+
+    pool = BrowserPool()
+    driver = MagicMock()
+    p = FreeboxProvider(login="a", password="b", download_path=tmp_path, pool=pool)
+    logged_in = [True]
+
+    async def ok() -> bool:
+        return True
+
+    monkeypatch.setattr(p, "_setup_driver", lambda: driver)
+    monkeypatch.setattr(p, "_login_sync", lambda otp_code=None: logged_in[0])
+    monkeypatch.setattr(p, "navigate_to_invoices", ok)
+    monkeypatch.setattr(p, "list_orders_or_invoices", lambda: [])
+    monkeypatch.setattr(p, "_wait_for", lambda *args, **kwargs: True)
+    monkeypatch.setattr(p, "_is_logged_in", lambda: True)
+
+    # Téléchargement terminé : navigateur rendu au pool
+    await p.download_invoices()
+    assert p.driver is None and pool._idle.qsize() == 1
+
+    # Écran 2FA : navigateur gardé pour submit_otp
+    logged_in[0] = False
+    with pytest.raises(Exception, match="connexion"):
+        await p.download_invoices()
+    assert p.driver is driver and pool._idle.qsize() == 0
+    assert p.is_2fa_required()
+    assert await p.submit_otp("123456")
+
+    # Relance après le code : rendu à la fin
+    logged_in[0] = True
+    await p.download_invoices()
+    assert p.driver is None and pool._idle.qsize() == 1
+
+    # Échec de connexion sans 2FA : rendu aussi
+    driver.find_element.side_effect = NoSuchElementException()
+    logged_in[0] = False
+    with pytest.raises(Exception, match="connexion"):
+        await p.download_invoices()
+    assert p.driver is None and pool._idle.qsize() == 1
@@ -0,0 +1,53 @@
+"""
+Tests du registre des factures téléchargées.
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from backend.services.invoice_registry import InvoiceRegistry
+
+
+def test_known_ids_requires_existing_file(tmp_path: Path) -> None:
+    registry = InvoiceRegistry(tmp_path)
+    (tmp_path / "a.pdf").write_bytes(b"%PDF")
+    registry.add("free_mobile", "inv_a", "a.pdf")
+    registry.add("free_mobile", "inv_b", "b.pdf")
+    assert registry.known_ids("free_mobile") == {"inv_a"}
+    assert registry.known_ids("free_mobile", check_file_exists=False) == {
+        "inv_a",
+        "inv_b",
+    }
+    assert registry.known_ids("freebox") == set()
+
+
+def test_known_ids_max_age_days(tmp_path: Path) -> None:
+    registry = InvoiceRegistry(tmp_path)
+    registry.add("free_mobile", "inv_new", "new.pdf")
+    registry.add("free_mobile", "inv_old", "old.pdf")
+    old = (datetime.utcnow() - timedelta(days=40)).isoformat() + "Z"
+    registry._data["free_mobile"][1]["downloaded_at"] = old
+    registry._save()
+    assert registry.known_ids(
+        "free_mobile", check_file_exists=False, max_age_days=30
+    ) == {"inv_new"}
+
+
+def test_get_entry_keeps_http_validators(tmp_path: Path) -> None:
+    registry = InvoiceRegistry(tmp_path)
+    (tmp_path / "a.pdf").write_bytes(b"%PDF")
+    registry.add(
+        "free_mobile",
+        "inv_a",
+        "a.pdf",
+        etag='"abc"',
+        last_modified="Mon, 02 Feb 2026 10:00:00 GMT",
+    )
+    registry.add("free_mobile", "inv_a", "a.pdf")
+    entry = registry.get_entry("free_mobile", "inv_a")
+    assert entry is not None
+    assert entry["etag"] == '"abc"'
+    assert entry["last_modified"] == "Mon, 02 Feb 2026 10:00:00 GMT"
+    registry.add("free_mobile", "inv_b", "b.pdf")
+    assert registry.get_entry("free_mobile", "inv_b") is None
+    assert registry.get_entry("free_mobile", "inv_b", check_file_exists=False)
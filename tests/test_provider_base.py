@@ -0,0 +1,69 @@
+"""
+Tests des utilitaires communs aux providers (téléchargements parallèles).
+"""
+
+import asyncio
+from typing import List, Optional
+
+import pytest
+
+from backend.providers.base import OrderInfo, download_concurrently, emit_progress
+
+
+def _orders(n: int) -> List[OrderInfo]:
+    return [OrderInfo(order_id=f"inv_{i}") for i in range(n)]
+
+
+@pytest.mark.asyncio
+async def test_download_concurrently_bounds_workers_and_invoices() -> None:
+    running = [0, 0]
+    calls: List[str] = []
+
+    async def download(i: int, order: OrderInfo) -> Optional[str]:
+        calls.append(order.order_id)
+        running[0] += 1
+        running[1] = max(running[1], running[0])
+        await asyncio.sleep(0.01)
+        running[0] -= 1
+        return f"{order.order_id}.pdf"
+
+    files = await download_concurrently(
+        _orders(10), download, max_invoices=2, max_workers=4, pause=0
+    )
+    assert len(files) == 2
+    # Jamais plus de téléchargements lancés qu'il ne manque de factures
+    assert len(calls) == 2
+    assert running[1] == 2
+
+
+@pytest.mark.asyncio
+async def test_download_concurrently_replaces_failed_downloads() -> None:
+    running = [0, 0]
+
+    async def download(i: int, order: OrderInfo) -> Optional[str]:
+        running[0] += 1
+        running[1] = max(running[1], running[0])
+        await asyncio.sleep(0.01)
+        running[0] -= 1
+        return None if i < 2 else f"{order.order_id}.pdf"
+
+    progress: List[int] = []
+
+    async def on_progress(current: int, total: int, message: str) -> None:
+        progress.append(current)
+
+    files = await download_concurrently(
+        _orders(6), download, 3, 3, on_progress=on_progress, pause=0
+    )
+    assert sorted(files) == ["inv_2.pdf", "inv_3.pdf", "inv_4.pdf"]
+    assert running[1] == 3
+    assert max(progress) == 3
+
+
+@pytest.mark.asyncio
+async def test_emit_progress_ignores_callback_errors() -> None:
+    def broken(current: int, total: int, message: str) -> None:
+        raise RuntimeError("callback cassé")
+
+    await emit_progress(broken, 1, 2, "message")
+    await emit_progress(None, 1, 2, "message")